@@ -24,8 +24,9 @@ from manifold_api import ManifoldAPI
 from config import PLATFORMS
 import os
 import json
-import math
+import time
 from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 from apscheduler.schedulers.background import BackgroundScheduler
 from paper_trading import PaperTradingSystem
@@ -60,6 +61,12 @@ POLYMARKET_FEE = 0.02  # 2% Polymarket fee
 KALSHI_FEE = 0.07      # 7% Kalshi fee
 SLIPPAGE_ESTIMATE = 0.005  # 0.5% slippage allowance
 
+# Effective-cost multipliers, folded once: the fee/slippage constants
+# never change at runtime, so per-call (1 + fee + slippage) sums are
+# redundant work in the per-game arbitrage path
+_POLY_MULT = 1.0 + POLYMARKET_FEE + SLIPPAGE_ESTIMATE
+_KALSHI_MULT = 1.0 + KALSHI_FEE + SLIPPAGE_ESTIMATE
+
 # Cache data to avoid too frequent API calls
 nba_cache = {
     'data': None,
@@ -79,6 +86,15 @@ nhl_cache = {
     'cache_duration': 30
 }
 
+# In-process memo for the combined all-sports result; within the TTL it
+# serves the same dict the disk cache holds without re-reading and
+# re-parsing all_sports_cache.json on every call
+all_sports_memo = {
+    'data': None,
+    'timestamp': 0.0,
+    'cache_duration': 30  # Matches the disk cache / frontend refresh
+}
+
 
 # Historical data storage (keep last 60 data points = 30 minutes at 30s intervals)
 nba_game_history = defaultdict(lambda: {
@@ -148,19 +164,26 @@ def _calculate_risk_free_details(poly_game, kalshi_game):
     if poly_away <= 0 or poly_home <= 0 or kalshi_away <= 0 or kalshi_home <= 0:
         return None
 
+    # Cheap filter first: fees and slippage only raise cost, so when the
+    # fee-free sum of both pairings already reaches 100 neither strategy
+    # can end with positive ROI — skip the effective-price math, which
+    # is the common case on real data
+    strategy1_gross = poly_away + kalshi_home
+    strategy2_gross = kalshi_away + poly_home
+    if strategy1_gross >= 100 and strategy2_gross >= 100:
+        return None
+
     # Calculate effective costs including fees and slippage for all four positions
-    poly_away_eff = poly_away * (1 + POLYMARKET_FEE + SLIPPAGE_ESTIMATE)
-    poly_home_eff = poly_home * (1 + POLYMARKET_FEE + SLIPPAGE_ESTIMATE)
-    kalshi_away_eff = kalshi_away * (1 + KALSHI_FEE + SLIPPAGE_ESTIMATE)
-    kalshi_home_eff = kalshi_home * (1 + KALSHI_FEE + SLIPPAGE_ESTIMATE)
+    poly_away_eff = poly_away * _POLY_MULT
+    poly_home_eff = poly_home * _POLY_MULT
+    kalshi_away_eff = kalshi_away * _KALSHI_MULT
+    kalshi_home_eff = kalshi_home * _KALSHI_MULT
 
     # Strategy 1: Polymarket Away + Kalshi Home (cross-market hedge)
     strategy1_cost = poly_away_eff + kalshi_home_eff
-    strategy1_gross = poly_away + kalshi_home
-    
+
     # Strategy 2: Kalshi Away + Polymarket Home (cross-market hedge)
     strategy2_cost = kalshi_away_eff + poly_home_eff
-    strategy2_gross = kalshi_away + poly_home
 
     # Pick the strategy with LOWEST total cost (best arbitrage opportunity)
     if strategy1_cost <= strategy2_cost:
@@ -474,10 +497,14 @@ def _build_nba_payload(now):
     poly_api = PolymarketAPI()
     kalshi_api = KalshiAPI()
 
-    poly_today = poly_api.get_nba_games(date_filter=today)
-    poly_tomorrow = poly_api.get_nba_games(date_filter=tomorrow)
-    poly_games = poly_today + poly_tomorrow
-    kalshi_games = kalshi_api.get_nba_games()
+    # The three fetches are independent network calls; run them concurrently
+    # so the payload build waits on the slowest one instead of the sum
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        poly_today_future = executor.submit(poly_api.get_nba_games, date_filter=today)
+        poly_tomorrow_future = executor.submit(poly_api.get_nba_games, date_filter=tomorrow)
+        kalshi_future = executor.submit(kalshi_api.get_nba_games)
+        poly_games = poly_today_future.result() + poly_tomorrow_future.result()
+        kalshi_games = kalshi_future.result()
 
     odds_games = []
     manifold_games = []
@@ -557,6 +584,11 @@ def fetch_all_sports_data(force_refresh=False):
     # Create a combined cache key
     cache_key = 'all_sports'
     if not force_refresh:
+        # In-process memo first: skips the disk read and JSON parse
+        # entirely while the result is still fresh
+        if all_sports_memo['data'] is not None and \
+                time.monotonic() - all_sports_memo['timestamp'] < all_sports_memo['cache_duration']:
+            return all_sports_memo['data']
         # Check if we have recent data
         try:
             with open('all_sports_cache.json', 'r') as f:
@@ -566,6 +598,8 @@ def fetch_all_sports_data(force_refresh=False):
                 if (now - cache_time).seconds < 30:  # Increase cache duration to 30s to match frontend
                     stats = cached.get('stats', {})
                     print(f"Using cached data: {stats.get('matched_games')} matched, {stats.get('arb_opportunities')} arb opportunities")
+                    all_sports_memo['data'] = cached
+                    all_sports_memo['timestamp'] = time.monotonic()
                     return cached
         except Exception as e:
             print(f"Cache read error: {e}")
@@ -725,8 +759,8 @@ def fetch_all_sports_data(force_refresh=False):
             if total > 0:
                 away_pct = (away_raw / total) * 100
                 home_pct = (home_raw / total) * 100
-                away_floor = math.floor(away_pct)
-                home_floor = math.floor(home_pct)
+                away_floor = int(away_pct)
+                home_floor = int(home_pct)
                 remainder = 100 - (away_floor + home_floor)
                 if away_raw <= home_raw:
                     entry['away_prob'] = away_floor + remainder
@@ -816,16 +850,24 @@ def fetch_all_sports_data(force_refresh=False):
     else:
         print(f"⚠️ Requirements NOT fully met after {search_iterations} iterations: {stats.get('matched_games')}/{MIN_MATCHED_GAMES} matched, {stats.get('arb_opportunities')}/{MIN_ARB_OPPORTUNITIES} arbs")
     
-    # Cache the result
+    # Cache the result (freshest data, so the memo updates even on a
+    # force_refresh call)
+    all_sports_memo['data'] = result
+    all_sports_memo['timestamp'] = time.monotonic()
     try:
         with open('all_sports_cache.json', 'w') as f:
             json.dump(result, f, indent=2)
     except Exception as e:
         print(f"Error caching result: {e}")
-    
+
     return result
 
 
+def _norm_name(name):
+    """Lowercase and strip separators from a team name for fuzzy comparison"""
+    return (name or '').lower().replace(' ', '').replace('-', '')
+
+
 def _fuzzy_match(poly_game, kalshi_game, threshold=0.8):
     """
     Fuzzy matching between Polymarket and Kalshi games
@@ -836,10 +878,10 @@ def _fuzzy_match(poly_game, kalshi_game, threshold=0.8):
         return True
     
     # Fuzzy team name matching
-    poly_away = poly_game['away_team'].lower().replace(' ', '').replace('-', '')
-    poly_home = poly_game['home_team'].lower().replace(' ', '').replace('-', '')
-    kalshi_away = kalshi_game['away_team'].lower().replace(' ', '').replace('-', '')
-    kalshi_home = kalshi_game['home_team'].lower().replace(' ', '').replace('-', '')
+    poly_away = _norm_name(poly_game['away_team'])
+    poly_home = _norm_name(poly_game['home_team'])
+    kalshi_away = _norm_name(kalshi_game['away_team'])
+    kalshi_home = _norm_name(kalshi_game['home_team'])
     
     # Calculate similarity scores
     away_similarity = _calculate_similarity(poly_away, kalshi_away)
@@ -869,14 +911,11 @@ def _calculate_similarity(str1, str2):
     if len1 == 0 or len2 == 0:
         return 0.0
     
-    # Convert to lowercase for case-insensitive comparison
-    s1 = str1.lower()
-    s2 = str2.lower()
-    
-    # Exact match after normalization
-    if s1 == s2:
-        return 1.0
-    
+    # Callers pass names already lowered by _norm_name, so no per-call
+    # lowering (and no extra string allocation) is needed here
+    s1 = str1
+    s2 = str2
+
     # Check if one string contains the other
     if s1 in s2 or s2 in s1:
         return 0.9
@@ -913,6 +952,12 @@ def _match_games_enhanced(poly_games, kalshi_games, fuzzy_threshold=0.7):
         key = f"{game.get('away_code')}@{game.get('home_code')}".lower()
         kalshi_dict[key] = game
 
+    # Normalize each Kalshi name once instead of once per candidate pair
+    kalshi_norms = [
+        (game, _norm_name(game.get('away_team', '')), _norm_name(game.get('home_team', '')))
+        for game in kalshi_games
+    ]
+
     for poly_game in poly_games:
         poly_key = f"{poly_game.get('away_code')}@{poly_game.get('home_code')}".lower()
         if poly_key in kalshi_dict:
@@ -927,18 +972,15 @@ def _match_games_enhanced(poly_games, kalshi_games, fuzzy_threshold=0.7):
         best_match = None
         best_score = fuzzy_threshold
 
-        for kalshi_game in kalshi_games:
+        poly_away_norm = _norm_name(poly_game.get('away_team', ''))
+        poly_home_norm = _norm_name(poly_game.get('home_team', ''))
+
+        for kalshi_game, kalshi_away_norm, kalshi_home_norm in kalshi_norms:
             if not _fuzzy_match(poly_game, kalshi_game, threshold=fuzzy_threshold):
                 continue
 
-            away_sim = _calculate_similarity(
-                (poly_game.get('away_team', '') or '').lower().replace(' ', '').replace('-', ''),
-                (kalshi_game.get('away_team', '') or '').lower().replace(' ', '').replace('-', '')
-            )
-            home_sim = _calculate_similarity(
-                (poly_game.get('home_team', '') or '').lower().replace(' ', '').replace('-', ''),
-                (kalshi_game.get('home_team', '') or '').lower().replace(' ', '').replace('-', '')
-            )
+            away_sim = _calculate_similarity(poly_away_norm, kalshi_away_norm)
+            home_sim = _calculate_similarity(poly_home_norm, kalshi_home_norm)
             avg_sim = (away_sim + home_sim) / 2
 
             if avg_sim > best_score:
@@ -1216,8 +1258,12 @@ def _build_nfl_payload(now):
     poly_api = NFLPolymarketAPI()
     kalshi_api = NFLKalshiAPI()
 
-    poly_games = poly_api.get_nfl_games()
-    kalshi_games = kalshi_api.get_nfl_games()
+    # Fetch both platforms concurrently - independent network calls
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        poly_future = executor.submit(poly_api.get_nfl_games)
+        kalshi_future = executor.submit(kalshi_api.get_nfl_games)
+        poly_games = poly_future.result()
+        kalshi_games = kalshi_future.result()
 
     matched = match_games(poly_games, kalshi_games)
     comparisons = calculate_comparisons(matched, NFL_TEAM_LOGOS, nfl_game_history)
@@ -1264,8 +1310,12 @@ def _build_nhl_payload(now):
     poly_api = NHLPolymarketAPI()
     kalshi_api = NHLKalshiAPI()
 
-    poly_games = poly_api.get_nhl_games()
-    kalshi_games = kalshi_api.get_nhl_games()
+    # Fetch both platforms concurrently - independent network calls
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        poly_future = executor.submit(poly_api.get_nhl_games)
+        kalshi_future = executor.submit(kalshi_api.get_nhl_games)
+        poly_games = poly_future.result()
+        kalshi_games = kalshi_future.result()
 
     matched = match_games(poly_games, kalshi_games)
     comparisons = calculate_comparisons(matched, NHL_TEAM_LOGOS, nhl_game_history)
@@ -1,28 +1,38 @@
 import requests
 import json
-import math
 from typing import List, Dict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter, Retry
 
 class CryptoKalshiAPI:
     BASE_URL = "https://api.elections.kalshi.com/trade-api/v2"
     CRYPTO_TICKERS = ["KXBTC", "KXETH"]
     
     def __init__(self):
+        # Pooled session shared across series fetches and worker threads
         self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=32,
+            max_retries=Retry(total=2, backoff_factor=0.3)
+        ))
 
     def get_crypto_markets(self, limit: int = 100) -> List[Dict]:
         """
         Get crypto markets from Kalshi
         """
         all_markets = []
-        
-        for ticker in self.CRYPTO_TICKERS:
-            markets = self._get_markets_by_ticker(ticker, limit=limit)
-            for market in markets:
-                processed = self._process_market(market)
-                if processed:
-                    all_markets.append(processed)
-                    
+
+        # Fetch both series concurrently; processing stays in the main thread
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            futures = [executor.submit(self._get_markets_by_ticker, ticker, limit)
+                       for ticker in self.CRYPTO_TICKERS]
+            for future in as_completed(futures):
+                for market in future.result():
+                    processed = self._process_market(market)
+                    if processed:
+                        all_markets.append(processed)
+
         return all_markets
 
     def _get_markets_by_ticker(self, series_ticker: str, limit: int = 100) -> List[Dict]:
@@ -74,8 +84,8 @@ class CryptoKalshiAPI:
             no_price = 100 - yes_price
             
             # Normalize
-            floor_yes = math.floor(yes_price)
-            floor_no = math.floor(no_price)
+            floor_yes = int(yes_price)
+            floor_no = int(no_price)
             remainder = 100 - (floor_yes + floor_no)
             
             if yes_price <= no_price:
@@ -1,7 +1,8 @@
 import requests
 import json
-import math
 from typing import List, Dict, Optional
+from requests.adapters import HTTPAdapter, Retry
+from polymarket_api import json_loads
 
 class CryptoPolymarketAPI:
     BASE_URL = "https://gamma-api.polymarket.com"
@@ -10,7 +11,13 @@ class CryptoPolymarketAPI:
     ETHEREUM_TAG_ID = "39"
     
     def __init__(self):
+        # Pooled session so repeated tag fetches reuse TCP+TLS connections
         self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=32,
+            max_retries=Retry(total=2, backoff_factor=0.3)
+        ))
 
     def get_crypto_markets(self, limit: int = 100) -> List[Dict]:
         """
@@ -78,11 +85,11 @@ class CryptoPolymarketAPI:
                      continue
                 
                 # Check if it is a Yes/No market (Binary)
-                outcomes = json.loads(market.get('outcomes', '[]'))
+                outcomes = json_loads(market.get('outcomes', '[]'))
                 if len(outcomes) != 2 or 'Yes' not in outcomes or 'No' not in outcomes:
                     continue
 
-                prices = json.loads(market.get('outcomePrices', '[]'))
+                prices = json_loads(market.get('outcomePrices', '[]'))
                 if len(prices) != 2:
                     continue
 
@@ -97,8 +104,8 @@ class CryptoPolymarketAPI:
                 no_price = float(prices[no_index]) * 100
                 
                 # Normalize probabilities
-                floor_yes = math.floor(yes_price)
-                floor_no = math.floor(no_price)
+                floor_yes = int(yes_price)
+                floor_no = int(no_price)
                 remainder = 100 - (floor_yes + floor_no)
                 
                 if yes_price <= no_price:
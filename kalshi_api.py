@@ -1,9 +1,12 @@
 import requests
-import math
 import json
+import re
 from typing import List, Dict
-from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter, Retry
 from team_mapping import normalize_team_name
+from probability_utils import round_two
+
 
 class KalshiAPI:
     BASE_URL = "https://api.elections.kalshi.com/trade-api/v2"
@@ -19,8 +22,35 @@ class KalshiAPI:
         "KXESPORTS", "KXCS2", "KXDOTA", "KXVALORANT"  # Esports
      ]
 
+    # Precompiled title tokenizers - one regex match per market instead of
+    # separate substring checks, replace() and split() passes
+    _WINNER_RE = re.compile(r'^(.+?)\s+vs\.?\s+(.+?)\s+[Ww]inner\?\s*$')
+    _H2H_RE = re.compile(r'^(.+?)\s+vs\.?\s+(.+?)(?:\s+[Ww]inner\?)?\s*$')
+
+    # Sport detection: one case-insensitive scan plus a dict lookup instead
+    # of a chain of lowered substring checks per ticker
+    _SPORT_KEYWORD_RE = re.compile(r'nba|nfl|nhl|csgo|cs2|dota|valorant|lol|esport', re.IGNORECASE)
+    _SPORT_BY_KEYWORD = {
+        'nba': 'basketball',
+        'nfl': 'football',
+        'nhl': 'hockey',
+        'cs2': 'cs2',
+        'csgo': 'cs2',
+        'dota': 'dota2',
+        'lol': 'lol',
+        'valorant': 'valorant',
+        'esport': 'other',
+    }
+
     def __init__(self):
+        # Pooled session shared by all fetches (and worker threads) so we pay
+        # the TCP+TLS handshake once per host instead of once per request
         self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=32,
+            max_retries=Retry(total=2, backoff_factor=0.3)
+        ))
 
     def get_market(self, ticker: str) -> Dict:
         """
@@ -143,7 +173,7 @@ class KalshiAPI:
         markets = self.get_markets_by_ticker(self.NBA_SERIES, limit=500)
 
         # Group markets by game (each game has 2 markets, one for each team)
-        games_dict = defaultdict(dict)
+        games_dict = {}
 
         for market in markets:
             # Check if market belongs to NBA series (double check)
@@ -154,28 +184,24 @@ class KalshiAPI:
 
             title = market.get('title', '')
 
-            # Filter for Winner markets only
-            if 'Winner?' not in title:
+            # Filter for Winner markets and extract team names in one pass
+            # Format: "Brooklyn vs Washington Winner?"
+            m = self._WINNER_RE.match(title)
+            if not m:
                 continue
 
             # Extract game identifier from ticker
             # Ticker format: KXNBAGAME-25NOV16BKNWAS-BKN
-            parts = ticker.split('-')
-            if len(parts) < 3:
+            # Cheap count gate avoids allocating the parts list on rejects
+            if ticker.count('-') < 2:
                 continue
+            parts = ticker.split('-', 2)
 
             game_id = parts[1]  # e.g., "25NOV16BKNWAS"
             team_code = parts[2]  # e.g., "BKN" or "WAS"
 
-            # Extract team names from title
-            # Format: "Brooklyn vs Washington Winner?"
-            title_clean = title.replace(' Winner?', '')
-            teams = title_clean.split(' vs ')
-            if len(teams) != 2:
-                continue
-
-            away_team = teams[0].strip()
-            home_team = teams[1].strip()
+            away_team = m.group(1).strip()
+            home_team = m.group(2).strip()
 
             # Get team codes
             away_code = normalize_team_name(away_team, 'kalshi')
@@ -189,55 +215,38 @@ class KalshiAPI:
             last_price = market.get('last_price', 0)
             probability = last_price  # last_price is already the correct percentage
 
-            # Store in games_dict
-            if game_id not in games_dict:
-                games_dict[game_id] = {
+            # Store in games_dict; bind the entry to a local so the writes
+            # below don't re-hash game_id on every access
+            game = games_dict.get(game_id)
+            if game is None:
+                game = {
                     'platform': 'Kalshi',
                     'away_team': away_team,
                     'home_team': home_team,
                     'away_code': away_code,
                     'home_code': home_code,
                     'close_time': market.get('close_time', ''),
-                    'ticker': ticker,
+                    'away_prob': None,
+                    'home_prob': None,
                 }
+                games_dict[game_id] = game
 
             # Add probability for this team
             if team_code == away_code:
-                games_dict[game_id]['away_prob'] = probability
-                games_dict[game_id]['away_ticker'] = ticker
+                game['away_prob'] = probability
+                game['away_ticker'] = ticker
             elif team_code == home_code:
-                games_dict[game_id]['home_prob'] = probability
-                games_dict[game_id]['home_ticker'] = ticker
+                game['home_prob'] = probability
+                game['home_ticker'] = ticker
 
         # Convert to list and filter complete games (with both probabilities)
         games = []
         for game_id, game_data in games_dict.items():
-            if 'away_prob' in game_data and 'home_prob' in game_data:
+            if game_data['away_prob'] is not None and game_data['home_prob'] is not None:
                 # Normalize probabilities to sum to exactly 100%
                 away_raw = game_data['away_prob']
                 home_raw = game_data['home_prob']
-                total = away_raw + home_raw
-                
-                if total > 0:
-                    # Convert to percentages
-                    away_pct = (away_raw / total) * 100
-                    home_pct = (home_raw / total) * 100
-                    
-                    # Floor both values
-                    away_floor = math.floor(away_pct)
-                    home_floor = math.floor(home_pct)
-                    remainder = 100 - (away_floor + home_floor)
-                    
-                    # Give remainder to the smaller raw value
-                    if away_raw <= home_raw:
-                        away_prob = away_floor + remainder
-                        home_prob = home_floor
-                    else:
-                        away_prob = away_floor
-                        home_prob = home_floor + remainder
-                else:
-                    away_prob = 0
-                    home_prob = 0
+                away_prob, home_prob = round_two(away_raw, home_raw)
 
                 # Update game data with normalized values
                 game_data['away_prob'] = away_prob
@@ -245,13 +254,15 @@ class KalshiAPI:
                 game_data['away_raw_price'] = away_raw
                 game_data['home_raw_price'] = home_raw
 
-                # Add Kalshi market URL
-                ticker = game_data.get('ticker', '')
-                if ticker:
-                    game_data['url'] = f'https://kalshi.com/markets/{ticker}'
-
                 games.append(game_data)
 
+        # Build URLs in a final pass over the complete list so the emit loop
+        # above stays tight; plain concatenation, no per-game f-string
+        for game_data in games:
+            ticker = game_data.get('away_ticker') or game_data.get('home_ticker')
+            if ticker:
+                game_data['url'] = 'https://kalshi.com/markets/' + ticker
+
         return games
 
     def get_today_games(self) -> List[Dict]:
@@ -265,27 +276,49 @@ class KalshiAPI:
         all_games = []
         seen_tickers = set()  # Avoid duplicates using ticker instead of id
 
-        for series_ticker in self.ALL_SPORTS_TICKERS:
+        # Fetch all series concurrently - this path is I/O-bound, so wall time
+        # becomes the slowest series instead of the sum of all round-trips.
+        # seen_tickers is only touched in the main thread after futures return.
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            future_to_series = {
+                executor.submit(self.get_markets_by_ticker, series_ticker, 500): series_ticker
+                for series_ticker in self.ALL_SPORTS_TICKERS
+            }
+            fetched_batches = []
+            for future in as_completed(future_to_series):
+                series_ticker = future_to_series[future]
+                try:
+                    fetched_batches.append((series_ticker, future.result()))
+                except Exception as e:
+                    print(f"Error fetching series {series_ticker}: {e}")
+
+        # Single parse pass over the concatenated batches. One games_dict is
+        # shared across every series, so a game whose two sides arrive under
+        # different series tickers still gets both probabilities merged.
+        games_dict = {}
+        for series_ticker, markets in fetched_batches:
             try:
-                markets = self.get_markets_by_ticker(series_ticker, limit=500)
-                
-                # Group markets by game (each game has 2 markets, one for each team)
-                games_dict = defaultdict(dict)
-                
                 for market in markets:
                     ticker = market.get('ticker')
-                    if not ticker or ticker in seen_tickers:
+                    if not ticker:
                         continue
+                    # One hash per market: add() and compare sizes instead
+                    # of a membership probe plus a second insert probe
+                    n_seen = len(seen_tickers)
                     seen_tickers.add(ticker)
+                    if len(seen_tickers) == n_seen:
+                        continue
 
                     # Process each market and group by game
                     game_data = self._process_market_for_all_sports_v2(market, series_ticker)
                     if game_data:
                         game_id = game_data.get('game_id')
                         if game_id:
-                            # Merge data for this game
-                            if game_id not in games_dict:
-                                games_dict[game_id] = {
+                            # Merge data for this game; bind the entry locally
+                            # to avoid re-hashing game_id for every write
+                            game = games_dict.get(game_id)
+                            if game is None:
+                                game = {
                                     'platform': 'Kalshi',
                                     'away_team': game_data['away_team'],
                                     'home_team': game_data['home_team'],
@@ -293,66 +326,54 @@ class KalshiAPI:
                                     'home_code': game_data['home_code'],
                                     'close_time': market.get('close_time', ''),
                                     'sport': game_data['sport'],
+                                    'away_prob': None,
+                                    'home_prob': None,
+                                    'away_raw_price': None,
+                                    'home_raw_price': None,
                                 }
-                            
+                                games_dict[game_id] = game
+
                             # Add probability for this team
                             if game_data['team_code'] == game_data['away_code']:
-                                games_dict[game_id]['away_prob'] = game_data['probability']
-                                games_dict[game_id]['away_raw_price'] = game_data['raw_price']
-                                games_dict[game_id]['away_ticker'] = market.get('ticker')
+                                game['away_prob'] = game_data['probability']
+                                game['away_raw_price'] = game_data['raw_price']
+                                game['away_ticker'] = market.get('ticker')
                             elif game_data['team_code'] == game_data['home_code']:
-                                games_dict[game_id]['home_prob'] = game_data['probability']
-                                games_dict[game_id]['home_raw_price'] = game_data['raw_price']
-                                games_dict[game_id]['home_ticker'] = market.get('ticker')
-
-                # Convert to list and filter complete games
-                for game_id, game_data in games_dict.items():
-                    if ('away_prob' in game_data and 'home_prob' in game_data and
-                        'away_raw_price' in game_data and 'home_raw_price' in game_data):
-                        
-                        # Normalize probabilities to sum to exactly 100%
-                        away_raw = game_data['away_raw_price']
-                        home_raw = game_data['home_raw_price']
-                        total = away_raw + home_raw
-                        
-                        if total > 0:
-                            # Convert to percentages
-                            away_pct = (away_raw / total) * 100
-                            home_pct = (home_raw / total) * 100
-                            
-                            # Floor both values
-                            away_floor = math.floor(away_pct)
-                            home_floor = math.floor(home_pct)
-                            remainder = 100 - (away_floor + home_floor)
-                            
-                            # Give remainder to the smaller raw value
-                            if away_raw <= home_raw:
-                                away_prob = away_floor + remainder
-                                home_prob = home_floor
-                            else:
-                                away_prob = away_floor
-                                home_prob = home_floor + remainder
-                        else:
-                            away_prob = 0
-                            home_prob = 0
-
-                        # Update game data with normalized values
-                        game_data['away_prob'] = away_prob
-                        game_data['home_prob'] = home_prob
-                        game_data['away_raw_price'] = away_raw
-                        game_data['home_raw_price'] = home_raw
-                        
-                        # Add URL and other fields
-                        game_data['url'] = f'https://kalshi.com/markets/{game_data.get("away_ticker", "")}'
-                        game_data['market_id'] = game_data.get('away_ticker', '')
-                        game_data['end_date'] = game_data.get('close_time', '')
-                        
-                        all_games.append(game_data)
+                                game['home_prob'] = game_data['probability']
+                                game['home_raw_price'] = game_data['raw_price']
+                                game['home_ticker'] = market.get('ticker')
 
             except Exception as e:
                 print(f"Error processing series {series_ticker}: {e}")
                 continue
 
+        # Single normalization pass over the unified dict
+        for game_id, game_data in games_dict.items():
+            if (game_data['away_prob'] is not None and game_data['home_prob'] is not None and
+                game_data['away_raw_price'] is not None and game_data['home_raw_price'] is not None):
+
+                # Normalize probabilities to sum to exactly 100%
+                away_raw = game_data['away_raw_price']
+                home_raw = game_data['home_raw_price']
+                away_prob, home_prob = round_two(away_raw, home_raw)
+
+                # Update game data with normalized values
+                game_data['away_prob'] = away_prob
+                game_data['home_prob'] = home_prob
+                game_data['away_raw_price'] = away_raw
+                game_data['home_raw_price'] = home_raw
+
+                # Add other fields (URL is filled in below)
+                game_data['market_id'] = game_data.get('away_ticker', '')
+                game_data['end_date'] = game_data.get('close_time', '')
+
+                all_games.append(game_data)
+
+        # Build URLs in a final pass over the complete list, keeping the
+        # normalization loop free of string formatting
+        for game_data in all_games:
+            game_data['url'] = 'https://kalshi.com/markets/' + game_data.get('away_ticker', '')
+
         return all_games
 
     def _process_market_for_all_sports_v2(self, market: Dict, series_ticker: str) -> Dict:
@@ -362,20 +383,13 @@ class KalshiAPI:
         title = market.get('title', '')
         ticker = market.get('ticker', '')
 
-        # Skip non-vs markets
-        if ' vs ' not in title:
+        # Skip non-vs markets and strip the Winner? suffix in a single match
+        m = self._H2H_RE.match(title)
+        if not m:
             return None
 
-        # Clean title - remove common suffixes
-        clean_title = title.replace(' Winner?', '').replace(' winner?', '').strip()
-
-        # Extract team names
-        teams = clean_title.split(' vs ')
-        if len(teams) != 2:
-            return None
-
-        away_team = teams[0].strip()
-        home_team = teams[1].strip()
+        away_team = m.group(1).strip()
+        home_team = m.group(2).strip()
 
         # Get team codes
         away_code = normalize_team_name(away_team, 'kalshi') or away_team
@@ -383,9 +397,10 @@ class KalshiAPI:
 
         # Extract game identifier from ticker
         # Ticker format: KXNBAGAME-25DEC03MIADAL-MIA
-        parts = ticker.split('-')
-        if len(parts) < 3:
+        # Cheap count gate avoids allocating the parts list on rejects
+        if ticker.count('-') < 2:
             return None
+        parts = ticker.split('-', 2)
 
         game_id = parts[1]  # e.g., "25DEC03MIADAL"
         team_code = parts[2]  # e.g., "MIA" or "DAL"
@@ -416,20 +431,14 @@ class KalshiAPI:
         title = market.get('title', '')
         ticker = market.get('ticker', '')
 
-        # Skip non-vs markets
-        if ' vs ' not in title:
+        # Reject non-H2H markets (the common case) on a single match() call
+        # instead of separate substring scans, replace() and split()
+        m = self._H2H_RE.match(title)
+        if not m:
             return None
 
-        # Clean title - remove common suffixes
-        clean_title = title.replace(' Winner?', '').replace(' winner?', '').strip()
-
-        # Extract team names
-        teams = clean_title.split(' vs ')
-        if len(teams) != 2:
-            return None
-
-        away_team = teams[0].strip()
-        home_team = teams[1].strip()
+        away_team = m.group(1).strip()
+        home_team = m.group(2).strip()
 
         # Get team codes
         away_code = normalize_team_name(away_team, 'kalshi') or away_team
@@ -442,13 +451,16 @@ class KalshiAPI:
                 return None
 
             # Determine which outcome corresponds to which team
-            # Use subtitle or check if team name is in the outcome
-            subtitle = market.get('subtitle', '').strip()
-            
-            if subtitle.lower() == away_team.lower():
+            # Use subtitle or check if team name is in the outcome;
+            # lowercase each string once instead of per comparison
+            subtitle_lc = market.get('subtitle', '').strip().lower()
+            away_lc = away_team.lower()
+            home_lc = home_team.lower()
+
+            if subtitle_lc == away_lc:
                 away_price = float(outcome_prices[0])
                 home_price = 100 - away_price
-            elif subtitle.lower() == home_team.lower():
+            elif subtitle_lc == home_lc:
                 home_price = float(outcome_prices[0])
                 away_price = 100 - home_price
             else:
@@ -457,8 +469,8 @@ class KalshiAPI:
                 home_price = float(outcome_prices[1])
 
             # Convert to probabilities
-            away_prob = math.floor(away_price)
-            home_prob = math.floor(home_price)
+            away_prob = int(away_price)
+            home_prob = int(home_price)
             remainder = 100 - (away_prob + home_prob)
             
             # Give remainder to smaller probability
@@ -492,22 +504,7 @@ class KalshiAPI:
 
     def _detect_sport_from_ticker(self, ticker: str) -> str:
         """Detect sport type from ticker"""
-        ticker_lower = ticker.lower()
-        if 'nba' in ticker_lower:
-            return 'basketball'
-        elif 'nfl' in ticker_lower:
-            return 'football'
-        elif 'nhl' in ticker_lower:
-            return 'hockey'
-        elif any(keyword in ticker_lower for keyword in ['cs2', 'csgo']):
-            return 'cs2'
-        elif 'dota' in ticker_lower:
-            return 'dota2'
-        elif 'lol' in ticker_lower:
-            return 'lol'
-        elif 'valorant' in ticker_lower:
-            return 'valorant'
-        elif 'esport' in ticker_lower:
-            return 'other'
-        else:
+        match = self._SPORT_KEYWORD_RE.search(ticker)
+        if not match:
             return 'other'
+        return self._SPORT_BY_KEYWORD[match.group(0).lower()]
@@ -4,9 +4,13 @@ Kalshi API for NFL games
 Fetches NFL game data from Kalshi
 """
 
+import logging
+
 from kalshi_api import KalshiAPI
-import math
 from nfl_team_mapping import normalize_team_name, get_team_info
+from probability_utils import round_two
+
+logger = logging.getLogger(__name__)
 
 class NFLKalshiAPI(KalshiAPI):
     def __init__(self):
@@ -85,28 +89,7 @@ class NFLKalshiAPI(KalshiAPI):
                 # Normalize probabilities to sum to exactly 100%
                 away_raw = team1_data['prob']
                 home_raw = team2_data['prob']
-                total = away_raw + home_raw
-                
-                if total > 0:
-                    # Convert to percentages
-                    away_pct = (away_raw / total) * 100
-                    home_pct = (home_raw / total) * 100
-                    
-                    # Floor both values
-                    away_floor = math.floor(away_pct)
-                    home_floor = math.floor(home_pct)
-                    remainder = 100 - (away_floor + home_floor)
-                    
-                    # Give remainder to the smaller raw value
-                    if away_raw <= home_raw:
-                        away_prob = away_floor + remainder
-                        home_prob = home_floor
-                    else:
-                        away_prob = away_floor
-                        home_prob = home_floor + remainder
-                else:
-                    away_prob = 0
-                    home_prob = 0
+                away_prob, home_prob = round_two(away_raw, home_raw)
 
                 # Create game entry (assume first team is away, second is home)
                 game = {
@@ -119,15 +102,20 @@ class NFLKalshiAPI(KalshiAPI):
                     'away_raw_price': away_raw,
                     'home_raw_price': home_raw,
                     'event_ticker': event_ticker,
-                    'url': f'https://kalshi.com/markets/{ticker}' if ticker else '',
+                    'ticker': ticker,
                 }
 
                 games.append(game)
 
+            # URL construction deferred to one pass over the finished list
+            for game in games:
+                ticker = game['ticker']
+                game['url'] = 'https://kalshi.com/markets/' + ticker if ticker else ''
+
             return games
 
-        except Exception as e:
-            print(f"Error fetching NFL games from Kalshi: {e}")
+        except Exception:
+            logger.exception("Error processing NFL games from Kalshi")
             return []
 
 
@@ -137,5 +125,5 @@ if __name__ == '__main__':
     api = NFLKalshiAPI()
     games = api.get_nfl_games()
     print(f"\nFound {len(games)} NFL games:")
-    for game in games[:5]:
-        print(f"  {game['away_team']} @ {game['home_team']}: {game['away_prob']:.1f}% vs {game['home_prob']:.1f}%")
+    print("\n".join(f"  {g['away_team']} @ {g['home_team']}: {g['away_prob']:.1f}% vs {g['home_prob']:.1f}%"
+                    for g in games[:5]))
@@ -1,6 +1,10 @@
 # NFL Team Name Mapping between Polymarket and Kalshi
 # Polymarket uses team nicknames, Kalshi uses city names
 
+import sys
+from functools import lru_cache
+from types import MappingProxyType
+
 # NFL Team Logos (using ESPN's CDN)
 NFL_TEAM_LOGOS = {
     'ARI': 'https://a.espncdn.com/i/teamlogos/nfl/500/ari.png',
@@ -78,6 +82,18 @@ NFL_TEAMS = {
 POLYMARKET_TO_CODE = {v[0]: k for k, v in NFL_TEAMS.items()}
 KALSHI_TO_CODE = {v[1]: k for k, v in NFL_TEAMS.items()}
 
+# Merged view for the any-platform fallback: one hash probe instead of
+# two cascaded lookups (Polymarket wins on collisions, as before)
+_ALL_TO_CODE = {**KALSHI_TO_CODE, **POLYMARKET_TO_CODE}
+
+# The mappings never change after import: intern the keys so lookup
+# hashing can use cached hashes / pointer identity, and freeze the dicts
+# so accidental writes fail loudly
+POLYMARKET_TO_CODE = MappingProxyType({sys.intern(k): v for k, v in POLYMARKET_TO_CODE.items()})
+KALSHI_TO_CODE = MappingProxyType({sys.intern(k): v for k, v in KALSHI_TO_CODE.items()})
+_ALL_TO_CODE = MappingProxyType({sys.intern(k): v for k, v in _ALL_TO_CODE.items()})
+
+@lru_cache(maxsize=4096)
 def normalize_team_name(name, platform='polymarket'):
     """
     Normalize team name to standard team code
@@ -89,15 +105,15 @@ def normalize_team_name(name, platform='polymarket'):
     Returns:
         Team code (e.g., 'KC', 'GB') or None if not found
     """
-    name = name.strip()
-
+    # Fast path: most inputs are already clean keys, so probe the mapping
+    # directly and only pay for the strip on a miss
     if platform == 'polymarket':
-        return POLYMARKET_TO_CODE.get(name)
+        return POLYMARKET_TO_CODE.get(name) or POLYMARKET_TO_CODE.get(name.strip())
     elif platform == 'kalshi':
-        return KALSHI_TO_CODE.get(name)
+        return KALSHI_TO_CODE.get(name) or KALSHI_TO_CODE.get(name.strip())
     else:
-        # Try both
-        return POLYMARKET_TO_CODE.get(name) or KALSHI_TO_CODE.get(name)
+        # Try both via the merged dict
+        return _ALL_TO_CODE.get(name) or _ALL_TO_CODE.get(name.strip())
 
 def get_team_info(code):
     """Get team information by team code"""
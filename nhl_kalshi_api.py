@@ -2,16 +2,19 @@
 """Kalshi API for NHL games"""
 
 from kalshi_api import KalshiAPI
-import math
+import re
 from typing import List, Dict
-from collections import defaultdict
 from nhl_team_mapping import normalize_team_name
+from probability_utils import round_two
 
 
 class NHLKalshiAPI(KalshiAPI):
     BASE_URL = "https://api.elections.kalshi.com/trade-api/v2"
     NHL_SERIES = "KXNHLGAME"
 
+    # Single-pass tokenizer for "Away vs Home Winner?" / "Away at Home Winner?"
+    _NHL_WINNER_RE = re.compile(r'^(.+?)\s+(?:vs\.?|at)\s+(.+?)\s+[Ww]inner\?\s*$')
+
     def __init__(self):
         super().__init__()
 
@@ -28,34 +31,25 @@ class NHLKalshiAPI(KalshiAPI):
                 nhl_markets.append(market)
 
         try:
-            games_dict = defaultdict(dict)
+            games_dict = {}
 
             for market in nhl_markets:
                 title = market.get('title', '')
-                if 'Winner?' not in title:
+                m = self._NHL_WINNER_RE.match(title)
+                if not m:
                     continue
 
                 ticker = market.get('ticker', '')
-                parts = ticker.split('-')
-                if len(parts) < 3:
+                # Cheap count gate avoids allocating the parts list on rejects
+                if ticker.count('-') < 2:
                     continue
+                parts = ticker.split('-', 2)
 
                 game_id = parts[1]
                 team_code = parts[2]
 
-                title_clean = title.replace(' Winner?', '')
-                if ' vs ' in title_clean:
-                    teams = title_clean.split(' vs ')
-                elif ' at ' in title_clean:
-                    teams = title_clean.split(' at ')
-                else:
-                    continue
-
-                if len(teams) != 2:
-                    continue
-
-                away_team = teams[0].strip()
-                home_team = teams[1].strip()
+                away_team = m.group(1).strip()
+                home_team = m.group(2).strip()
 
                 away_code = normalize_team_name(away_team, 'kalshi')
                 home_code = normalize_team_name(home_team, 'kalshi')
@@ -80,8 +74,10 @@ class NHLKalshiAPI(KalshiAPI):
                 else:
                     probability = 0
 
-                if game_id not in games_dict:
-                    games_dict[game_id] = {
+                # Bind the entry locally so writes don't re-hash game_id
+                game = games_dict.get(game_id)
+                if game is None:
+                    game = {
                         'platform': 'Kalshi',
                         'away_team': away_team,
                         'home_team': home_team,
@@ -89,49 +85,39 @@ class NHLKalshiAPI(KalshiAPI):
                         'home_code': home_code,
                         'close_time': market.get('close_time', ''),
                         'ticker': ticker,
+                        'away_raw': None,
+                        'home_raw': None,
                     }
+                    games_dict[game_id] = game
 
-                if team_code == away_code or normalize_team_name(team_code, 'kalshi') == away_code:
-                    games_dict[game_id]['away_raw'] = probability
-                elif team_code == home_code or normalize_team_name(team_code, 'kalshi') == home_code:
-                    games_dict[game_id]['home_raw'] = probability
+                # Normalize the ticker code once; the away/home branches
+                # previously each issued their own normalize call
+                norm_code = normalize_team_name(team_code, 'kalshi')
+                if team_code == away_code or norm_code == away_code:
+                    game['away_raw'] = probability
+                elif team_code == home_code or norm_code == home_code:
+                    game['home_raw'] = probability
 
             games = []
             for game_id, game_data in games_dict.items():
-                if 'away_raw' in game_data and 'home_raw' in game_data:
+                if game_data['away_raw'] is not None and game_data['home_raw'] is not None:
                     away_raw = game_data['away_raw']
                     home_raw = game_data['home_raw']
-                    total = away_raw + home_raw
-
-                    if total > 0:
-                        away_pct = (away_raw / total) * 100
-                        home_pct = (home_raw / total) * 100
-
-                        away_floor = math.floor(away_pct)
-                        home_floor = math.floor(home_pct)
-                        remainder = 100 - (away_floor + home_floor)
-
-                        if away_raw <= home_raw:
-                            away_prob = away_floor + remainder
-                            home_prob = home_floor
-                        else:
-                            away_prob = away_floor
-                            home_prob = home_floor + remainder
-                    else:
-                        away_prob = 0
-                        home_prob = 0
+                    away_prob, home_prob = round_two(away_raw, home_raw)
 
                     game_data['away_prob'] = away_prob
                     game_data['home_prob'] = home_prob
                     game_data['away_raw_price'] = away_raw
                     game_data['home_raw_price'] = home_raw
 
-                    ticker = game_data.get('ticker', '')
-                    if ticker:
-                        game_data['url'] = f'https://kalshi.com/markets/{ticker}'
-
                     games.append(game_data)
 
+            # URL construction deferred to one pass over the finished list
+            for game_data in games:
+                ticker = game_data.get('ticker', '')
+                if ticker:
+                    game_data['url'] = 'https://kalshi.com/markets/' + ticker
+
             return games
 
         except Exception as e:
@@ -144,5 +130,5 @@ if __name__ == '__main__':
     api = NHLKalshiAPI()
     games = api.get_nhl_games()
     print(f"\nFound {len(games)} NHL games on Kalshi:")
-    for game in games[:5]:
-        print(f"  {game['away_team']} @ {game['home_team']}: {game['away_prob']}% vs {game['home_prob']}%")
+    print("\n".join(f"  {g['away_team']} @ {g['home_team']}: {g['away_prob']}% vs {g['home_prob']}%"
+                    for g in games[:5]))
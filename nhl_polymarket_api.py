@@ -1,11 +1,13 @@
 #!/usr/bin/env python3
 """Polymarket API for NHL games"""
 
-from polymarket_api import PolymarketAPI
-import json
-import math
+from polymarket_api import PolymarketAPI, json_loads
+import re
 from nhl_team_mapping import normalize_team_name
 
+# Splits "A vs B" / "A vs. B" in one scan, compiled once at import
+_MATCHUP_SPLIT_RE = re.compile(r'\s+vs\.?\s+')
+
 
 class NHLPolymarketAPI(PolymarketAPI):
     def __init__(self):
@@ -37,113 +39,102 @@ class NHLPolymarketAPI(PolymarketAPI):
 
     def _parse_game(self, event):
         """Parse a single game event"""
-        try:
-            title = event.get('title', '')
-
-            if ' vs. ' not in title and ' vs ' not in title:
-                return None
-
-            if ' vs. ' in title:
-                teams = title.split(' vs. ')
-            else:
-                teams = title.split(' vs ')
+        # Upstream payloads can carry explicit nulls; coerce them to the
+        # empty defaults so a malformed event is skipped, not a crash
+        title = event.get('title') or ''
 
-            if len(teams) != 2:
-                return None
+        teams = _MATCHUP_SPLIT_RE.split(title)
+        if len(teams) != 2:
+            return None
 
-            away_team = teams[0].strip()
-            home_team = teams[1].strip()
+        away_team = teams[0].strip()
+        home_team = teams[1].strip()
 
-            away_code = normalize_team_name(away_team, 'polymarket')
-            home_code = normalize_team_name(home_team, 'polymarket')
+        away_code = normalize_team_name(away_team, 'polymarket')
+        home_code = normalize_team_name(home_team, 'polymarket')
 
-            if not away_code or not home_code:
-                return None
-
-            winner_market = None
-            for market in event.get('markets', []):
-                question = market.get('question', '')
-                if question == title:
-                    winner_market = market
-                    break
-
-            if not winner_market:
-                for market in event.get('markets', []):
-                    question = market.get('question', '')
-                    if 'Moneyline' in question and '1H' not in question and '1P' not in question:
-                        winner_market = market
-                        break
+        if not away_code or not home_code:
+            return None
 
-            if not winner_market:
-                return None
+        # Single pass: an exact title match wins immediately, the first
+        # Moneyline candidate is remembered instead of re-walking the list
+        winner_market = None
+        fallback = None
+        for market in event.get('markets') or []:
+            question = market.get('question') or ''
+            if question == title:
+                winner_market = market
+                break
+            if (fallback is None and 'Moneyline' in question
+                    and '1H' not in question and '1P' not in question):
+                fallback = market
+
+        if winner_market is None:
+            winner_market = fallback
+
+        if not winner_market:
+            return None
 
-            outcomes = json.loads(winner_market.get('outcomes', '[]'))
-            prices = json.loads(winner_market.get('outcomePrices', '[]'))
+        # The decode and float conversion are the only steps that can
+        # genuinely raise on malformed data, so the except stays narrow
+        try:
+            outcomes = json_loads(winner_market.get('outcomes', '[]'))
+            prices = json_loads(winner_market.get('outcomePrices', '[]'))
 
             if len(outcomes) != 2 or len(prices) != 2:
                 return None
 
+            # (code, raw) tuples - no per-outcome dict allocation needed
             outcome_data = []
             for outcome, price in zip(outcomes, prices):
                 team_code = normalize_team_name(outcome, 'polymarket')
                 if team_code:
-                    outcome_data.append({
-                        'code': team_code,
-                        'raw_prob': float(price) * 100
-                    })
-
-            if len(outcome_data) != 2:
-                return None
+                    outcome_data.append((team_code, float(price) * 100))
+        except (TypeError, ValueError):
+            return None
 
-            prob1 = outcome_data[0]['raw_prob']
-            prob2 = outcome_data[1]['raw_prob']
-
-            floor1 = math.floor(prob1)
-            floor2 = math.floor(prob2)
-            remainder = 100 - (floor1 + floor2)
-
-            if prob1 <= prob2:
-                outcome_data[0]['prob'] = floor1 + remainder
-                outcome_data[1]['prob'] = floor2
-            else:
-                outcome_data[0]['prob'] = floor1
-                outcome_data[1]['prob'] = floor2 + remainder
-
-            probs = {
-                outcome_data[0]['code']: outcome_data[0]['prob'],
-                outcome_data[1]['code']: outcome_data[1]['prob']
-            }
-
-            raw_probs = {
-                outcome_data[0]['code']: outcome_data[0]['raw_prob'],
-                outcome_data[1]['code']: outcome_data[1]['raw_prob']
-            }
-
-            slug = event.get('slug', '')
-            game = {
-                'away_team': away_team,
-                'home_team': home_team,
-                'away_code': away_code,
-                'home_code': home_code,
-                'away_prob': probs.get(away_code, 0),
-                'home_prob': probs.get(home_code, 0),
-                'away_raw_price': raw_probs.get(away_code, 0),
-                'home_raw_price': raw_probs.get(home_code, 0),
-                'market_id': winner_market.get('id'),
-                'end_date': event.get('endDate', ''),
-                'slug': slug,
-                'url': f'https://polymarket.com/event/{slug}' if slug else '',
-            }
-
-            return game
-
-        except Exception as e:
+        if len(outcome_data) != 2:
             return None
 
+        code1, prob1 = outcome_data[0]
+        code2, prob2 = outcome_data[1]
+
+        floor1 = int(prob1)
+        floor2 = int(prob2)
+        remainder = 100 - (floor1 + floor2)
+
+        if prob1 <= prob2:
+            final1 = floor1 + remainder
+            final2 = floor2
+        else:
+            final1 = floor1
+            final2 = floor2 + remainder
+
+        probs = {code1: final1, code2: final2}
+        raw_probs = {code1: prob1, code2: prob2}
+
+        slug = event.get('slug', '')
+        game = {
+            'away_team': away_team,
+            'home_team': home_team,
+            'away_code': away_code,
+            'home_code': home_code,
+            'away_prob': probs.get(away_code, 0),
+            'home_prob': probs.get(home_code, 0),
+            'away_raw_price': raw_probs.get(away_code, 0),
+            'home_raw_price': raw_probs.get(home_code, 0),
+            'market_id': winner_market.get('id'),
+            'end_date': event.get('endDate', ''),
+            'slug': slug,
+            'url': f'https://polymarket.com/event/{slug}' if slug else '',
+        }
+
+        return game
+
 
 if __name__ == '__main__':
     api = NHLPolymarketAPI()
     games = api.get_nhl_games()
     print(f"\nFound {len(games)} NHL games:")
-    for game in games[:5]:
-        print(f"  {game['away_team']} @ {game['home_team']}: {game['away_prob']}% vs {game['home_prob']}%")
+    print("\n".join(f"  {g['away_team']} @ {g['home_team']}: {g['away_prob']}% vs {g['home_prob']}%"
+                    for g in games[:5]))
@@ -1,5 +1,9 @@
 """NHL Team Name Mapping between Polymarket and Kalshi"""
 
+import sys
+from functools import lru_cache
+from types import MappingProxyType
+
 # NHL Team Logos
 NHL_TEAM_LOGOS = {
     'ANA': 'https://a.espncdn.com/i/teamlogos/nhl/500/ana.png',
@@ -88,22 +92,34 @@ KALSHI_TO_CODE['Utah HC'] = 'UTA'
 for code in NHL_TEAMS.keys():
     KALSHI_TO_CODE[code] = code
 
+# Merged view for the any-platform fallback: one hash probe instead of
+# three cascaded lookups (later dicts win on collisions, so Polymarket
+# keeps its current precedence). Built after the alias fixups above.
+_ALL_TO_CODE = {**FULLNAME_TO_CODE, **KALSHI_TO_CODE, **POLYMARKET_TO_CODE}
+
+# The mappings never change past this point: intern the keys so lookup
+# hashing can use cached hashes / pointer identity, and freeze the dicts
+# so accidental writes fail loudly
+POLYMARKET_TO_CODE = MappingProxyType({sys.intern(k): v for k, v in POLYMARKET_TO_CODE.items()})
+KALSHI_TO_CODE = MappingProxyType({sys.intern(k): v for k, v in KALSHI_TO_CODE.items()})
+FULLNAME_TO_CODE = MappingProxyType({sys.intern(k): v for k, v in FULLNAME_TO_CODE.items()})
+_ALL_TO_CODE = MappingProxyType({sys.intern(k): v for k, v in _ALL_TO_CODE.items()})
+
 
 
+@lru_cache(maxsize=4096)
 def normalize_team_name(name, platform='polymarket'):
     """Normalize team name to standard code"""
-    name = name.strip()
-    
+    # Fast path: most inputs are already clean keys, so probe the mapping
+    # directly and only pay for the strip on a miss
     if platform == 'polymarket':
-        return POLYMARKET_TO_CODE.get(name)
+        return POLYMARKET_TO_CODE.get(name) or POLYMARKET_TO_CODE.get(name.strip())
     elif platform == 'kalshi':
-        return KALSHI_TO_CODE.get(name)
+        return KALSHI_TO_CODE.get(name) or KALSHI_TO_CODE.get(name.strip())
     elif platform in ['odds_api', 'manifold']:
-        return FULLNAME_TO_CODE.get(name)
+        return FULLNAME_TO_CODE.get(name) or FULLNAME_TO_CODE.get(name.strip())
     else:
-        return (POLYMARKET_TO_CODE.get(name) or
-                KALSHI_TO_CODE.get(name) or
-                FULLNAME_TO_CODE.get(name))
+        return _ALL_TO_CODE.get(name) or _ALL_TO_CODE.get(name.strip())
 
 
 def get_team_info(code):
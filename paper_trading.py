@@ -1,63 +1,406 @@
+import atexit
 import json
 import os
+import queue
+import threading
+import time
+from collections import deque
 from datetime import datetime
 
+# orjson's C serializer is much faster than stdlib and emits bytes
+# directly; fall back to compact stdlib output when unavailable
+try:
+    from orjson import dumps as _orjson_dumps, loads as _json_loads
+except ImportError:
+    _orjson_dumps = None
+    _json_loads = json.loads
+
+# numpy is only used to vectorize batch scans; everything works without it
+try:
+    import numpy as _np
+except ImportError:
+    _np = None
+
 DATA_FILE = 'paper_trading_data.json'
+DATA_LOG = 'paper_trading_data.jsonl'
+
+# compact() rotates the live log here until the snapshot covering it has
+# been written; load_data replays it before the live log if a crash
+# struck in between
+DATA_LOG_OLD = DATA_LOG + '.old'
+
+# Compact the event log once it holds this many lines per stored bet
+COMPACT_RATIO = 10
+
+# Statuses that count as an open position (duplicate-trade prevention)
+_OPEN = frozenset({'pending', 'locked'})
+
+# Liquidity heuristics for _is_high_liquidity_game
+_HIGH_LIQ_SPORTS = frozenset({'basketball', 'football', 'hockey'})
+_MAJOR_TEAMS = ('Lakers', 'Warriors', 'Bucks', 'Nets', 'Celtics', 'Heat', 'Nuggets', 'Suns')
+
+# Fee / slippage model shared by execute_arb and scan_games
+POLY_FEE = 0.02  # 2% fee
+KALSHI_FEE = 0.07  # 7% fee
+SLIPPAGE_ESTIMATE = 0.005  # 0.5% slippage estimate
+LIQUIDITY_DISCOUNT = 0.01  # 1% discount for larger trades
+
+# [monotonic deadline, cached ISO timestamp] for _cached_iso_now
+_ts_cache = [0.0, '']
+
+def _cached_iso_now(granularity=0.1):
+    """datetime.now().isoformat(), recomputed at most every `granularity`s.
+
+    Bets placed within the same scan tick share one wallclock reading
+    instead of paying the localtime+format path per trade.
+    """
+    now = time.monotonic()
+    if now - _ts_cache[0] > granularity or not _ts_cache[1]:
+        _ts_cache[0] = now
+        _ts_cache[1] = datetime.now().isoformat()
+    return _ts_cache[1]
+
+def _pick(d, *keys):
+    """First non-None value among d[key] for keys, else None.
+
+    One hash probe per key, short-circuiting on the first hit — unlike
+    d.get(a, d.get(b)), which always evaluates the fallback lookup.
+    """
+    for k in keys:
+        v = d.get(k)
+        if v is not None:
+            return v
+    return None
+
+def _envfloat(key, default):
+    """Read a float env var once; bad or missing values fall back."""
+    try:
+        return float(os.environ.get(key, default))
+    except (TypeError, ValueError):
+        return default
 
 class PaperTradingSystem:
+    _instance = None
+    _instance_lock = threading.Lock()
+
     def __init__(self):
-        self.load_data()
+        self._log_fp = None
+        self._log_lines = 0
+        # Monotonic per-event sequence number: snapshots record the last
+        # one they cover, so replay never re-applies covered events
+        self._event_seq = 0
+        self._buffered = False
+        self._dirty = False
+        # Config is read once here instead of per execute_arb call;
+        # restart (or a fresh instance) picks up env changes
+        self._bet_amount = _envfloat('PAPER_TRADING_BET_AMOUNT', 100.0)
+        self._min_roi = _envfloat('PAPER_TRADING_MIN_ROI', 0.0)
+        self._initial_balance = _envfloat('PAPER_TRADING_INITIAL_BALANCE', 10000.0)
+        # Construction is cheap: the data file is parsed lazily on first
+        # access via the `data` property
+        self._data = None
+        # Background snapshot writer (started on first use)
+        self._save_q = None
+        self._writer = None
+
+    @classmethod
+    def instance(cls):
+        """Process-wide shared instance (dedupes the file load across callers)."""
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    @property
+    def data(self):
+        if self._data is None:
+            self.load_data()
+        return self._data
+
+    def __enter__(self):
+        """Buffer writes for a batch of mutations (e.g. a scan loop).
+
+        Usage: `with system: for game in games: system.execute_arb(game)`
+        Log events are still appended but only flushed once on exit, and
+        any snapshot request is deferred until the block ends.
+        """
+        self._buffered = True
+        self._dirty = False
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._buffered = False
+        if self._log_fp is not None:
+            self._log_fp.flush()
+        if self._dirty:
+            self.save_data()
+            self._dirty = False
+        return False
 
     def load_data(self):
         if os.path.exists(DATA_FILE):
             try:
-                with open(DATA_FILE, 'r') as f:
-                    self.data = json.load(f)
-            except:
+                with open(DATA_FILE, 'rb') as f:
+                    self._data = _json_loads(f.read())
+            except (OSError, ValueError):
                 self.reset_data()
         else:
             self.reset_data()
+        # The snapshot's watermark tells replay which events it already
+        # contains; it is bookkeeping, not account state
+        self._event_seq = self._data.pop('_seq', 0)
+        self._replay_log()
+        # One pass over history builds the open-bet index (O(1) duplicate
+        # checks), the running profit aggregates, and the newest-first
+        # view served by get_state; mutation points keep all of them
+        # current so get_state never rescans or re-sorts
+        self._open_bets = {}
+        self._total_realized = 0.0
+        self._total_estimated = 0.0
+        self._bets_by_time = deque()
+        for b in self.data['bets']:
+            status = b['status']
+            if status in _OPEN:
+                self._open_bets[b['id']] = b
+            if status == 'settled':
+                self._total_realized += b.get('realized_profit', 0.0)
+            elif status == 'pending':
+                self._total_estimated += b.get('profit', 0.0)
+            self._bets_by_time.appendleft(b)
 
     def reset_data(self):
-        try:
-            initial_balance = float(os.environ.get('PAPER_TRADING_INITIAL_BALANCE', 10000))
-        except:
-            initial_balance = 10000.0
-            
-        self.data = {
+        initial_balance = self._initial_balance
+        self._data = {
             'balance': initial_balance,
             'initial_balance': initial_balance,
             'bets': [], # List of placed bets (trades)
             'total_profit': 0.0
         }
+        self._truncate_log()
         self.save_data()
 
     def save_data(self):
-        with open(DATA_FILE, 'w') as f:
-            json.dump(self.data, f, indent=4)
+        """Write a full snapshot of the current state to DATA_FILE.
+
+        Deferred while inside a `with system:` buffered block.
+        """
+        if self._buffered:
+            self._dirty = True
+            return
+        self._write_snapshot()
+        # The snapshot now covers everything in the event log; stale
+        # events replayed on top of it at the next load would re-append
+        # bets and rewind the balance to their recorded values
+        self._truncate_log()
+
+    def _write_snapshot(self, data=None):
+        if data is None:
+            data = self.data
+        if '_seq' not in data:
+            # Watermark: the highest event sequence this snapshot folds
+            # in (enqueued copies carry theirs from copy time)
+            data = {**data, '_seq': self._event_seq}
+        # Write to a temp file and rename into place so a crash mid-write
+        # can never leave a torn DATA_FILE (which load_data would treat as
+        # corrupt and silently reset the account)
+        tmp = DATA_FILE + '.tmp'
+        # Compact output by default; set PAPER_TRADING_PRETTY=1 to keep
+        # the old indent=4 layout for debugging
+        if os.environ.get('PAPER_TRADING_PRETTY'):
+            payload = json.dumps(data, indent=4).encode()
+        elif _orjson_dumps is not None:
+            payload = _orjson_dumps(data)
+        else:
+            payload = json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode()
+        with open(tmp, 'wb') as f:
+            f.write(payload)
+            # Durability is opt-in: fsync per snapshot is expensive and the
+            # event log already covers everything since the last snapshot
+            if os.environ.get('PAPER_TRADING_FSYNC'):
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp, DATA_FILE)
+
+    def _replay_log(self):
+        """Apply events logged since the last snapshot onto self.data.
+
+        A leftover rotated log means the process died somewhere between
+        compact() and the cleanup after its snapshot landed; its events
+        predate the live log's, so they replay first, and the snapshot's
+        sequence watermark filters out anything it already contains.
+        Only live-log lines count toward the compaction ratio.
+        """
+        self._log_lines = 0
+        snapshot_seq = self._event_seq
+        try:
+            if os.path.exists(DATA_LOG_OLD):
+                self._replay_file(DATA_LOG_OLD, snapshot_seq)
+            if os.path.exists(DATA_LOG):
+                self._log_lines = self._replay_file(DATA_LOG, snapshot_seq)
+        except:
+            # Corrupt log: fall back to the snapshot alone
+            self._truncate_log()
+
+    def _replay_file(self, path, snapshot_seq):
+        replayed = 0
+        with open(path, 'r') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                replayed += 1
+                event = _json_loads(line)
+                seq = event.get('s')
+                if seq is not None:
+                    if seq > self._event_seq:
+                        self._event_seq = seq
+                    if seq <= snapshot_seq:
+                        # Already folded into the snapshot we loaded
+                        continue
+                kind = event.get('t')
+                if kind == 'bet':
+                    self.data['bets'].append(event['bet'])
+                elif kind == 'settle':
+                    for bet in self.data['bets']:
+                        if bet['id'] == event.get('id') and bet['status'] == 'pending':
+                            bet['status'] = 'settled'
+                            bet['settled_amount'] = event.get('settled_amount', 0.0)
+                            bet['realized_profit'] = event.get('realized_profit', 0.0)
+                            bet['profit'] = bet['realized_profit']
+                            break
+                elif kind == 'bal':
+                    self.data['balance'] = event['v']
+        return replayed
+
+    def _append_event(self, event):
+        """Append one event to the JSONL log (O(1) per mutation).
+
+        The hot paths (execute_arb, update_settlements) log deltas here
+        instead of rewriting the whole data file; load_data replays the
+        log on top of the last snapshot.
+        """
+        if self._log_fp is None:
+            self._log_fp = open(DATA_LOG, 'a')
+        self._event_seq += 1
+        event['s'] = self._event_seq
+        self._log_fp.write(json.dumps(event, separators=(',', ':')) + '\n')
+        self._log_lines += 1
+        if self._buffered:
+            return
+        self._log_fp.flush()
+        if self._log_lines > COMPACT_RATIO * max(len(self.data['bets']), 1):
+            self.compact()
+
+    def _truncate_log(self):
+        """Drop both log segments; callers snapshot synchronously first."""
+        if self._log_fp is not None:
+            self._log_fp.close()
+            self._log_fp = None
+        if os.path.exists(DATA_LOG):
+            open(DATA_LOG, 'w').close()
+        if os.path.exists(DATA_LOG_OLD):
+            os.remove(DATA_LOG_OLD)
+        self._log_lines = 0
+
+    def _rotate_log(self):
+        """Set the live log aside until the next snapshot has hit disk.
+
+        New events go to a fresh live log; the rotated segment is only
+        removed by the writer thread after a snapshot covering it is
+        durably in place, so a crash in between loses nothing —
+        load_data replays the rotated segment before the live one, and
+        the sequence watermark keeps covered events from re-applying.
+        """
+        if self._log_fp is not None:
+            self._log_fp.close()
+            self._log_fp = None
+        if os.path.exists(DATA_LOG):
+            if os.path.exists(DATA_LOG_OLD):
+                # A prior rotation is still awaiting its snapshot; fold
+                # the live log onto it so nothing pending is replaced
+                with open(DATA_LOG_OLD, 'ab') as dst, open(DATA_LOG, 'rb') as src:
+                    dst.write(src.read())
+                open(DATA_LOG, 'w').close()
+            else:
+                os.replace(DATA_LOG, DATA_LOG_OLD)
+        self._log_lines = 0
+
+    def _start_writer(self):
+        if self._writer is not None:
+            return
+        self._save_q = queue.Queue(maxsize=1)
+
+        def _run():
+            while True:
+                snapshot = self._save_q.get()
+                try:
+                    self._write_snapshot(snapshot)
+                    # Only now is the rotated segment covered by durable
+                    # state; a crash before this point replays it (the
+                    # sequence watermark deduplicates any overlap)
+                    try:
+                        os.remove(DATA_LOG_OLD)
+                    except OSError:
+                        pass
+                finally:
+                    self._save_q.task_done()
+
+        self._writer = threading.Thread(target=_run, daemon=True, name='paper-trading-writer')
+        self._writer.start()
+        atexit.register(self.flush_writes)
+
+    def _enqueue_snapshot(self):
+        """Hand a copy of the current state to the background writer.
+
+        The queue holds at most one snapshot; under a burst the newest
+        state replaces whatever is still waiting, so the writer only ever
+        persists the latest view.
+        """
+        self._start_writer()
+        # Shallow copy so the writer thread doesn't race with appends;
+        # the watermark is frozen here so the snapshot declares exactly
+        # which events it folds in
+        snapshot = {**self.data, 'bets': list(self.data['bets']), '_seq': self._event_seq}
+        while True:
+            try:
+                self._save_q.put_nowait(snapshot)
+                return
+            except queue.Full:
+                try:
+                    self._save_q.get_nowait()
+                    self._save_q.task_done()
+                except queue.Empty:
+                    pass
+
+    def flush_writes(self):
+        """Block until any queued background snapshot has hit disk."""
+        if self._save_q is not None:
+            self._save_q.join()
+
+    def compact(self):
+        """Fold the event log into a fresh snapshot and rotate it out.
+
+        The snapshot copy is handed to the background writer so the hot
+        path (auto-compaction inside _append_event) never blocks on
+        disk. The log is rotated, not truncated: the rotated segment
+        stays on disk until the writer confirms the snapshot covering
+        it has landed, so a crash before then cannot lose events.
+        """
+        self._rotate_log()
+        self._enqueue_snapshot()
 
     def get_state(self):
-        # Calculate summary
-        total_trades = len(self.data['bets'])
-        
-        # Profit includes realized profit from settled bets
-        total_profit = sum(bet.get('realized_profit', 0.0) for bet in self.data['bets'] if bet['status'] == 'settled')
-        
-        # Estimated profit from pending bets
-        estimated_profit = sum(bet.get('profit', 0.0) for bet in self.data['bets'] if bet['status'] == 'pending')
-        
-        current_balance = self.data['balance']
-        
-        # Sort bets by timestamp desc
-        sorted_bets = sorted(self.data['bets'], key=lambda x: x['timestamp'], reverse=True)
-        
+        # All aggregates are maintained incrementally at mutation points;
+        # bets are appended in timestamp order, so the deque already holds
+        # the newest-first view the UI wants
         return {
-            'balance': current_balance,
+            'balance': self.data['balance'],
             'initial_balance': self.data['initial_balance'],
-            'total_profit': total_profit,
-            'estimated_profit': estimated_profit,
-            'total_trades': total_trades,
-            'bets': sorted_bets
+            'total_profit': self._total_realized,
+            'estimated_profit': self._total_estimated,
+            'total_trades': len(self.data['bets']),
+            'bets': list(self._bets_by_time)
         }
 
     def _normalize_risk_details(self, details):
@@ -93,6 +436,62 @@ class PaperTradingSystem:
         
         return None
 
+    def _build_leg(self, game, poly, kalshi, side, platform, price, eff):
+        """Build one leg dict for a side ('away'/'home') on a platform.
+
+        Single construction point shared by the pre-calculated and legacy
+        paths in execute_arb.
+        """
+        if side == 'away':
+            team = game.get('away_team', 'Away')
+            code = game.get('away_code')
+            poly_market_id = poly.get('away_market_id') or poly.get('market_id')
+            kalshi_ticker = kalshi.get('away_ticker')
+        else:
+            team = game.get('home_team', 'Home')
+            code = game.get('home_code')
+            poly_market_id = poly.get('home_market_id') or poly.get('market_id')
+            kalshi_ticker = kalshi.get('home_ticker')
+
+        if platform == 'Polymarket':
+            market_id, url, fee_rate = poly_market_id, poly.get('url', ''), POLY_FEE
+        else:
+            market_id, url, fee_rate = kalshi_ticker, kalshi.get('url', ''), KALSHI_FEE
+
+        return {
+            'platform': platform,
+            'price': price,
+            'eff': eff,
+            'team': team,
+            'code': code,
+            'market_id': market_id,
+            'url': url,
+            'fee_rate': fee_rate,
+            # Names a settlement winner may arrive as; a list so it
+            # survives the JSON round trip
+            '_match_set': [x for x in (code, team) if x is not None]
+        }
+
+    def _enrich_legs(self, best_away, best_home, quantity):
+        """Fill per-leg cost/fee/slippage figures for exactly two legs.
+
+        Returns (fees_total_usd, slippage_total_usd) so callers don't
+        re-read the leg dicts to sum them.
+        """
+        slip_factor = SLIPPAGE_ESTIMATE * quantity * 0.01
+        fees_total = 0.0
+        slippage_total = 0.0
+        for leg in (best_away, best_home):
+            eff_q = leg['eff'] * quantity
+            price_q = leg['price'] * quantity
+            leg['cost_usd'] = eff_q * 0.01
+            leg['fee_usd'] = (eff_q - price_q) * 0.01
+            leg['payout_usd'] = quantity * 1.0
+            leg['slippage_usd'] = leg['price'] * slip_factor
+            fees_total += leg['fee_usd']
+            slippage_total += leg['slippage_usd']
+        return fees_total, slippage_total
+
     def execute_arb(self, game, amount_per_leg=100.0):
         """
         Attempt to execute a risk-free arb trade on the given game.
@@ -116,21 +515,13 @@ class PaperTradingSystem:
             if not poly or not kalshi or poly.get('away') is None or poly.get('home') is None:
                 return False, "Missing platform data"
             
-            try:
-                target_units = float(os.environ.get('PAPER_TRADING_BET_AMOUNT', 100))
-            except:
-                target_units = 100.0
-            
+            target_units = self._bet_amount
             quantity = target_units
             total_cost_usd = (risk_detail['totalCost'] / 100.0) * quantity
             profit_usd = (risk_detail['edge'] / 100.0) * quantity
             roi_percent = risk_detail.get('roiPercent', 0)
             
-            try:
-                min_roi = float(os.environ.get('PAPER_TRADING_MIN_ROI', 0))
-            except:
-                min_roi = 0.0
-            
+            min_roi = self._min_roi
             if roi_percent <= min_roi:
                 return False, f"ROI ({roi_percent:.2f}%) below threshold ({min_roi}%)"
             
@@ -138,14 +529,9 @@ class PaperTradingSystem:
                 return False, "Insufficient balance"
             
             game_id = f"{game.get('away_code')}@{game.get('home_code')}"
-            for bet in self.data['bets']:
-                if bet['id'] == game_id and bet['status'] in ['pending', 'locked']:
-                    return False, "Market already traded (duplicate trade prevention)"
-            
-            POLY_FEE = 0.02
-            KALSHI_FEE = 0.07
-            SLIPPAGE_ESTIMATE = 0.005
-            
+            if game_id in self._open_bets:
+                return False, "Market already traded (duplicate trade prevention)"
+
             away_platform = risk_detail['bestAwayFrom']
             home_platform = risk_detail['bestHomeFrom']
             
@@ -161,41 +547,18 @@ class PaperTradingSystem:
             if away_platform not in ['Polymarket', 'Kalshi'] or home_platform not in ['Polymarket', 'Kalshi']:
                 return False, f"Invalid arbitrage: Unknown platforms detected - Away: {away_platform}, Home: {home_platform}"
             
-            best_away = {
-                'platform': away_platform,
-                'price': risk_detail['bestAwayPrice'],
-                'eff': risk_detail['bestAwayEffective'],
-                'team': game.get('away_team', 'Away'),
-                'code': game.get('away_code'),
-                'market_id': poly.get('away_market_id') or poly.get('market_id') if away_platform == 'Polymarket' else kalshi.get('away_ticker'),
-                'url': poly.get('url', '') if away_platform == 'Polymarket' else kalshi.get('url', ''),
-                'fee_rate': POLY_FEE if away_platform == 'Polymarket' else KALSHI_FEE
-            }
-            
-            best_home = {
-                'platform': home_platform,
-                'price': risk_detail['bestHomePrice'],
-                'eff': risk_detail['bestHomeEffective'],
-                'team': game.get('home_team', 'Home'),
-                'code': game.get('home_code'),
-                'market_id': poly.get('home_market_id') or poly.get('market_id') if home_platform == 'Polymarket' else kalshi.get('home_ticker'),
-                'url': poly.get('url', '') if home_platform == 'Polymarket' else kalshi.get('url', ''),
-                'fee_rate': POLY_FEE if home_platform == 'Polymarket' else KALSHI_FEE
-            }
-            
-            for leg in [best_away, best_home]:
-                leg_cost_cents = leg['eff'] * quantity
-                leg_price_cents = leg['price'] * quantity
-                leg['cost_usd'] = leg_cost_cents / 100.0
-                leg['fee_usd'] = (leg_cost_cents - leg_price_cents) / 100.0
-                leg['payout_usd'] = quantity * 1.0
-                leg['slippage_usd'] = (leg['price'] * SLIPPAGE_ESTIMATE * quantity) / 100.0
+            best_away = self._build_leg(game, poly, kalshi, 'away', away_platform,
+                                        risk_detail['bestAwayPrice'], risk_detail['bestAwayEffective'])
+            best_home = self._build_leg(game, poly, kalshi, 'home', home_platform,
+                                        risk_detail['bestHomePrice'], risk_detail['bestHomeEffective'])
             
+            fees_total_usd, slippage_total_usd = self._enrich_legs(best_away, best_home, quantity)
+
             trade = {
                 'id': game_id,
                 'game': f"{game.get('away_team')} vs {game.get('home_team')}",
                 'sport': game.get('sport', 'unknown'),
-                'timestamp': datetime.now().isoformat(),
+                'timestamp': _cached_iso_now(),
                 'game_time': game.get('game_time', '') or game.get('end_date', ''),
                 'legs': [best_away, best_home],
                 'quantity': quantity,
@@ -206,27 +569,23 @@ class PaperTradingSystem:
                 'status': 'pending',
                 'settled_amount': 0.0,
                 'realized_profit': 0.0,
-                'fees_total_usd': best_away['fee_usd'] + best_home['fee_usd'],
-                'slippage_total_usd': best_away['slippage_usd'] + best_home['slippage_usd'],
+                'fees_total_usd': fees_total_usd,
+                'slippage_total_usd': slippage_total_usd,
                 'arb_type': 'perfect' if risk_detail['totalCost'] < 100 else 'near',
                 'total_cost_per_unit': risk_detail['totalCost'],
                 'bet_amount_config': target_units
             }
             
             self.data['bets'].append(trade)
+            self._open_bets[game_id] = trade
+            self._bets_by_time.appendleft(trade)
+            self._total_estimated += profit_usd
             self.data['balance'] -= total_cost_usd
-            self.save_data()
+            self._append_event({'t': 'bet', 'bet': trade})
+            self._append_event({'t': 'bal', 'v': self.data['balance']})
             return True, trade
         
         # Fallback to legacy calculation if no pre-calculated arb
-        # Dynamic fees based on platform and market conditions
-        POLY_FEE = 0.02  # 2% fee
-        KALSHI_FEE = 0.07  # 7% fee
-        
-        # Additional slippage and market impact estimates
-        SLIPPAGE_ESTIMATE = 0.005  # 0.5% slippage estimate
-        LIQUIDITY_DISCOUNT = 0.01   # 1% discount for larger trades
-        
         poly = game.get('polymarket', {})
         kalshi = game.get('kalshi', {})
         
@@ -234,12 +593,12 @@ class PaperTradingSystem:
         if not poly or not kalshi:
             return False, "Missing platform data for arbitrage"
             
-        poly_away = poly.get('raw_away', poly.get('away'))
-        poly_home = poly.get('raw_home', poly.get('home'))
-        kalshi_away = kalshi.get('raw_away', kalshi.get('away'))
-        kalshi_home = kalshi.get('raw_home', kalshi.get('home'))
-        
-        if None in [poly_away, poly_home, kalshi_away, kalshi_home]:
+        poly_away = _pick(poly, 'raw_away', 'away')
+        poly_home = _pick(poly, 'raw_home', 'home')
+        kalshi_away = _pick(kalshi, 'raw_away', 'away')
+        kalshi_home = _pick(kalshi, 'raw_home', 'home')
+
+        if poly_away is None or poly_home is None or kalshi_away is None or kalshi_home is None:
             return False, "Missing odds"
 
         # Ensure team info exists
@@ -263,61 +622,23 @@ class PaperTradingSystem:
         # Strategy 2: Kalshi Away + Polymarket Home (cross-market hedge)
         strategy2_cost = kalshi_away_eff + poly_home_eff
         
-        # Pick the strategy with LOWEST total cost (best arbitrage opportunity)
+        # Pick the strategy with LOWEST total cost (best arbitrage opportunity).
+        # Both strategies pair opposite outcomes on different platforms, so
+        # cross-market hedging is guaranteed by construction; a per-side
+        # independent minimum could put both legs on one platform.
         if strategy1_cost <= strategy2_cost:
-            # Use Strategy 1: Polymarket Away + Kalshi Home
-            # CRITICAL VALIDATION: This ensures cross-market hedging (opposite outcomes on different platforms)
-            away_platform = 'Polymarket'
-            home_platform = 'Kalshi'
-            
-            best_away = {
-                'platform': 'Polymarket', 
-                'price': poly_away, 
-                'eff': poly_away_eff, 
-                'team': game.get('away_team', 'Away'),
-                'code': game.get('away_code'),
-                'market_id': poly.get('away_market_id') or poly.get('market_id'),
-                'url': poly.get('url', ''),
-                'fee_rate': POLY_FEE
-            }
-            best_home = {
-                'platform': 'Kalshi', 
-                'price': kalshi_home, 
-                'eff': kalshi_home_eff, 
-                'team': game.get('home_team', 'Home'),
-                'code': game.get('home_code'),
-                'market_id': kalshi.get('home_ticker'),
-                'url': kalshi.get('url', ''),
-                'fee_rate': KALSHI_FEE
-            }
+            # Strategy 1: Polymarket Away + Kalshi Home
+            away_platform, away_price, away_eff = 'Polymarket', poly_away, poly_away_eff
+            home_platform, home_price, home_eff = 'Kalshi', kalshi_home, kalshi_home_eff
             total_cost_per_unit = strategy1_cost
         else:
-            # Use Strategy 2: Kalshi Away + Polymarket Home
-            # CRITICAL VALIDATION: This ensures cross-market hedging (opposite outcomes on different platforms)
-            away_platform = 'Kalshi'
-            home_platform = 'Polymarket'
-            
-            best_away = {
-                'platform': 'Kalshi', 
-                'price': kalshi_away, 
-                'eff': kalshi_away_eff, 
-                'team': game.get('away_team', 'Away'),
-                'code': game.get('away_code'),
-                'market_id': kalshi.get('away_ticker'),
-                'url': kalshi.get('url', ''),
-                'fee_rate': KALSHI_FEE
-            }
-            best_home = {
-                'platform': 'Polymarket', 
-                'price': poly_home, 
-                'eff': poly_home_eff, 
-                'team': game.get('home_team', 'Home'),
-                'code': game.get('home_code'),
-                'market_id': poly.get('home_market_id') or poly.get('market_id'),
-                'url': poly.get('url', ''),
-                'fee_rate': POLY_FEE
-            }
+            # Strategy 2: Kalshi Away + Polymarket Home
+            away_platform, away_price, away_eff = 'Kalshi', kalshi_away, kalshi_away_eff
+            home_platform, home_price, home_eff = 'Polymarket', poly_home, poly_home_eff
             total_cost_per_unit = strategy2_cost
+
+        best_away = self._build_leg(game, poly, kalshi, 'away', away_platform, away_price, away_eff)
+        best_home = self._build_leg(game, poly, kalshi, 'home', home_platform, home_price, home_eff)
         
         # CRITICAL VALIDATION: Prevent cross-platform same-side bets
         # Ensure we are not buying the same outcome on both platforms
@@ -328,12 +649,8 @@ class PaperTradingSystem:
         if total_cost_per_unit >= 100:
             return False, "No risk-free arb opportunity (total cost ≥ 100¢)"
             
-        # Get bet size from env (Target Payout Quantity)
-        try:
-            target_units = float(os.environ.get('PAPER_TRADING_BET_AMOUNT', 100))
-        except:
-            target_units = 100.0
-
+        # Bet size (Target Payout Quantity), cached from env at init
+        target_units = self._bet_amount
         units = target_units
 
         # Apply liquidity discount for larger trades
@@ -352,12 +669,7 @@ class PaperTradingSystem:
         # Enhanced ROI calculation
         roi_percent = (profit_usd / total_cost_usd * 100) if total_cost_usd > 0 else 0
         
-        try:
-            min_roi = float(os.environ.get('PAPER_TRADING_MIN_ROI', 0))
-        except:
-            min_roi = 0.0
-            
-        roi_threshold = max(min_roi, 0.0)
+        roi_threshold = max(self._min_roi, 0.0)
             
         if roi_percent <= roi_threshold:
             return False, f"ROI ({roi_percent:.2f}%) below threshold ({roi_threshold}%)"
@@ -367,25 +679,18 @@ class PaperTradingSystem:
 
         # Requirement 1: Enhanced duplicate check - reject duplicate trades
         game_id = f"{game['away_code']}@{game['home_code']}"
-        for bet in self.data['bets']:
-            if bet['id'] == game_id and bet['status'] in ['pending', 'locked']:
-                return False, "Market already traded (duplicate trade prevention)"
+        if game_id in self._open_bets:
+            return False, "Market already traded (duplicate trade prevention)"
 
         # Enrich legs with detailed cost info
-        for leg in [best_away, best_home]:
-            leg_cost_cents = leg['eff'] * quantity
-            leg_price_cents = leg['price'] * quantity
-            leg['cost_usd'] = leg_cost_cents / 100.0
-            leg['fee_usd'] = (leg_cost_cents - leg_price_cents) / 100.0
-            leg['payout_usd'] = quantity * 1.0 # If this leg wins
-            leg['slippage_usd'] = (leg['price'] * SLIPPAGE_ESTIMATE * quantity) / 100.0
+        fees_total_usd, slippage_total_usd = self._enrich_legs(best_away, best_home, quantity)
 
         # Execute
         trade = {
             'id': game_id,
             'game': f"{game['away_team']} vs {game['home_team']}",
             'sport': game.get('sport', 'unknown'),
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': _cached_iso_now(),
             'game_time': game.get('game_time', '') or game.get('end_date', ''),
             'legs': [best_away, best_home],
             'quantity': quantity,
@@ -396,8 +701,8 @@ class PaperTradingSystem:
             'status': 'pending', 
             'settled_amount': 0.0,
             'realized_profit': 0.0,
-            'fees_total_usd': best_away['fee_usd'] + best_home['fee_usd'],
-            'slippage_total_usd': best_away['slippage_usd'] + best_home['slippage_usd'],
+            'fees_total_usd': fees_total_usd,
+            'slippage_total_usd': slippage_total_usd,
             'arb_type': 'binary_cross_market',
             'total_cost_per_unit': total_cost_per_unit,
             'bet_amount_config': target_units,
@@ -407,89 +712,168 @@ class PaperTradingSystem:
         }
         
         self.data['bets'].append(trade)
+        self._open_bets[game_id] = trade
+        self._bets_by_time.appendleft(trade)
+        self._total_estimated += profit_usd
         self.data['balance'] -= total_cost_usd
-        
-        self.save_data()
+
+        self._append_event({'t': 'bet', 'bet': trade})
+        self._append_event({'t': 'bal', 'v': self.data['balance']})
         return True, trade
 
+    def scan_games(self, games, amount_per_leg=100.0):
+        """Scan a batch of games for arbs in one pass.
+
+        The legacy-path cost arithmetic is computed for all games at once
+        (vectorized with numpy when available) so the full execute_arb
+        path only runs for games that can actually clear the <100¢ total
+        cost bar. File writes are batched via the buffered context
+        manager. Returns a list of (success, result) aligned with games.
+        """
+        results = [(False, "No risk-free arb opportunity (total cost ≥ 100¢)")] * len(games)
+        candidates = []  # indices worth running the full path on
+        legacy = []      # (index, poly_away, poly_home, kalshi_away, kalshi_home)
+
+        for i, game in enumerate(games):
+            # Pre-calculated arbs and malformed games go straight to
+            # execute_arb, which validates them and reports the exact reason
+            if game.get('riskFreeArb') or game.get('risk_free_arb'):
+                candidates.append(i)
+                continue
+            poly = game.get('polymarket') or {}
+            kalshi = game.get('kalshi') or {}
+            poly_away = _pick(poly, 'raw_away', 'away')
+            poly_home = _pick(poly, 'raw_home', 'home')
+            kalshi_away = _pick(kalshi, 'raw_away', 'away')
+            kalshi_home = _pick(kalshi, 'raw_home', 'home')
+            if poly_away is None or poly_home is None or kalshi_away is None or kalshi_home is None:
+                candidates.append(i)
+                continue
+            legacy.append((i, poly_away, poly_home, kalshi_away, kalshi_home))
+
+        if legacy:
+            poly_mult = 1 + POLY_FEE + SLIPPAGE_ESTIMATE
+            kalshi_mult = 1 + KALSHI_FEE + SLIPPAGE_ESTIMATE
+            if _np is not None:
+                arr = _np.asarray([row[1:] for row in legacy], dtype=_np.float64)
+                strategy1 = arr[:, 0] * poly_mult + arr[:, 3] * kalshi_mult
+                strategy2 = arr[:, 2] * kalshi_mult + arr[:, 1] * poly_mult
+                tradable = _np.minimum(strategy1, strategy2) < 100
+                candidates.extend(row[0] for row, ok in zip(legacy, tradable) if ok)
+            else:
+                for i, poly_away, poly_home, kalshi_away, kalshi_home in legacy:
+                    strategy1 = poly_away * poly_mult + kalshi_home * kalshi_mult
+                    strategy2 = kalshi_away * kalshi_mult + poly_home * poly_mult
+                    if min(strategy1, strategy2) < 100:
+                        candidates.append(i)
+
+        with self:
+            for i in sorted(candidates):
+                results[i] = self.execute_arb(games[i], amount_per_leg)
+        return results
+
     def _is_high_liquidity_game(self, game):
         """Determine if a game has high liquidity based on sport and teams"""
-        high_liquidity_sports = ['basketball', 'football', 'hockey']
-        sport = game.get('sport', '').lower()
-        
         # Major sports typically have higher liquidity
-        if sport in high_liquidity_sports:
+        if game.get('sport', '').lower() in _HIGH_LIQ_SPORTS:
             return True
-            
-        # Check for major teams (simplified)
-        major_teams = ['Lakers', 'Warriors', 'Bucks', 'Nets', 'Celtics', 'Heat', 'Nuggets', 'Suns']
-        away_team = game.get('away_team', '')
-        home_team = game.get('home_team', '')
-        
-        return any(team in away_team or team in home_team for team in major_teams)
 
-    def update_settlements(self, check_status_func):
+        # Check for major teams (simplified): one substring scan over the
+        # joined names instead of two per candidate
+        combined = game.get('away_team', '') + '|' + game.get('home_team', '')
+        return any(team in combined for team in _MAJOR_TEAMS)
+
+    def update_settlements(self, check_status_func, check_status_batch_func=None):
         """
         Check pending bets and settle them if resolved.
         check_status_func(platform, market_id) -> {'resolved': bool, 'winner': str/code}
+        check_status_batch_func, if given, resolves all unique
+        (platform, market_id) pairs in one call and returns a dict keyed
+        by those pairs — one round trip instead of two per pending bet.
         """
-        changed = False
-        for bet in self.data['bets']:
-            if bet['status'] == 'pending':
-                all_legs_resolved = True
-                total_payout = 0.0
-                resolved_legs_count = 0
-                
-                # Check status of each leg
-                for leg in bet['legs']:
-                    platform = leg.get('platform')
-                    market_id = leg.get('market_id')
-                    
-                    # Attempt to recover market_id from URL if missing (specifically for Kalshi)
-                    if not market_id and platform == 'Kalshi' and leg.get('url'):
-                        try:
-                            url = leg.get('url')
-                            if '/markets/' in url:
-                                parts = url.split('/markets/')
-                                if len(parts) > 1:
-                                    ticker = parts[1].split('?')[0].split('#')[0]
-                                    market_id = ticker
-                                    leg['market_id'] = market_id
-                                    changed = True # Save recovered ID
-                        except:
-                            pass
-
-                    if not market_id:
-                        # Fallback for old bets or missing data
-                        continue
-                        
-                    status = check_status_func(platform, market_id)
-                    
-                    if not status.get('resolved'):
-                        all_legs_resolved = False
-                        break
-                    
-                    resolved_legs_count += 1
-                    
-                    # Check if won
-                    winner = status.get('winner')
-                    # leg['code'] is team code. leg['team'] is team name.
-                    # Winner should be matched against these.
-                    # normalize team name?
-                    
-                    if str(winner) == str(leg.get('code')) or str(winner) == str(leg.get('team')):
-                         # Won leg
-                         total_payout += bet['quantity'] * 1.0
-                
-                if all_legs_resolved and resolved_legs_count == len(bet['legs']):
-                    # Settle
-                    bet['status'] = 'settled'
-                    bet['settled_amount'] = total_payout
-                    bet['realized_profit'] = total_payout - bet['cost']
-                    bet['profit'] = bet['realized_profit']
-                    self.data['balance'] += total_payout
-                    changed = True
-                    print(f"Settled bet {bet['id']}. Payout: {total_payout}. Profit: {bet['realized_profit']}")
-
-        if changed:
-            self.save_data()
+        self.data  # ensure lazy load has run (builds _open_bets)
+        recovered = False
+        open_bets = [b for b in self._open_bets.values() if b['status'] == 'pending']
+
+        # Recover missing Kalshi market_ids from leg URLs up front so the
+        # status lookup below sees them
+        for bet in open_bets:
+            for leg in bet['legs']:
+                if not leg.get('market_id') and leg.get('platform') == 'Kalshi' and leg.get('url'):
+                    try:
+                        url = leg['url']
+                        if '/markets/' in url:
+                            parts = url.split('/markets/')
+                            if len(parts) > 1:
+                                leg['market_id'] = parts[1].split('?')[0].split('#')[0]
+                                recovered = True # Not log-replayable; snapshot below
+                    except:
+                        pass
+
+        # One status lookup per unique (platform, market_id) pair; legs on
+        # the same market share the result
+        pairs = {(leg.get('platform'), leg.get('market_id'))
+                 for bet in open_bets for leg in bet['legs'] if leg.get('market_id')}
+        if check_status_batch_func is not None:
+            statuses = check_status_batch_func(list(pairs))
+        else:
+            statuses = {pair: check_status_func(*pair) for pair in pairs}
+
+        for bet in open_bets:
+            all_legs_resolved = True
+            total_payout = 0.0
+            resolved_legs_count = 0
+
+            # Check status of each leg
+            for leg in bet['legs']:
+                market_id = leg.get('market_id')
+                if not market_id:
+                    # Fallback for old bets or missing data
+                    continue
+
+                status = statuses.get((leg.get('platform'), market_id)) or {}
+
+                if not status.get('resolved'):
+                    all_legs_resolved = False
+                    break
+
+                resolved_legs_count += 1
+
+                # Check if won: the winner may arrive as the team code or
+                # the team name. A None winner is a no-match (the old
+                # str() coercion let str(None) == 'None' slip through).
+                winner = status.get('winner')
+                if winner is not None:
+                    match_set = leg.get('_match_set')
+                    if match_set is None:
+                        # Legacy bet predating _match_set: build and cache
+                        match_set = [x for x in (leg.get('code'), leg.get('team')) if x is not None]
+                        leg['_match_set'] = match_set
+                    if winner in match_set:
+                        # Won leg
+                        total_payout += bet['quantity'] * 1.0
+
+            if all_legs_resolved and resolved_legs_count == len(bet['legs']):
+                # Settle (move the expected profit out of the estimate
+                # before it is overwritten with the realized figure)
+                self._total_estimated -= bet.get('profit', 0.0)
+                bet['status'] = 'settled'
+                bet['settled_amount'] = total_payout
+                bet['realized_profit'] = total_payout - bet['cost']
+                self._total_realized += bet['realized_profit']
+                bet['profit'] = bet['realized_profit']
+                self.data['balance'] += total_payout
+                self._open_bets.pop(bet['id'], None)
+                self._append_event({
+                    't': 'settle',
+                    'id': bet['id'],
+                    'settled_amount': total_payout,
+                    'realized_profit': bet['realized_profit']
+                })
+                self._append_event({'t': 'bal', 'v': self.data['balance']})
+                print(f"Settled bet {bet['id']}. Payout: {total_payout}. Profit: {bet['realized_profit']}")
+
+        if recovered:
+            # Recovered market_ids live inside legs and are not captured by
+            # log events, so fold everything into a fresh snapshot
+            self.compact()
@@ -1,7 +1,10 @@
 import requests
 import json
-import math
+import logging
+import re
+from functools import lru_cache
 from typing import List, Dict, Optional
+from requests.adapters import HTTPAdapter, Retry
 from team_mapping import normalize_team_name as normalize_nba
 try:
     from nfl_team_mapping import normalize_team_name as normalize_nfl
@@ -15,7 +18,19 @@ try:
     from football_team_mapping import normalize_team_name as normalize_football
 except ImportError:
     normalize_football = lambda x, y: None
+try:
+    # Optional fast JSON decoder for the per-market outcomes/outcomePrices
+    # strings; orjson.JSONDecodeError subclasses ValueError so the existing
+    # error handling keeps working
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
+
+# Parse errors are per-market and can be frequent on bad API runs; lazy
+# %s formatting means the message is only built when a handler wants it
+logger = logging.getLogger(__name__)
 
+@lru_cache(maxsize=4096)
 def normalize_team_name(name, platform='polymarket'):
     # Try all normalizers
     code = normalize_nba(name, platform)
@@ -31,6 +46,16 @@ def normalize_team_name(name, platform='polymarket'):
 class PolymarketAPI:
     BASE_URL = "https://gamma-api.polymarket.com"
     NBA_TAG_ID = "745"
+
+    # Accepts Winner/Moneyline questions while rejecting 1H/Map markets in a
+    # single traversal instead of four separate substring scans
+    _FALLBACK_WINNER_RE = re.compile(r'(?!.*(?:1H|Map)).*(?:Winner|Moneyline)')
+    # League prefixes on event titles, compiled once instead of a
+    # startswith loop per event
+    _LEAGUE_PREFIX_RE = re.compile(r'^(?:NBA|NFL|NHL|EPL|LoL|CS2|Dota 2|Valorant|MLB):\s*')
+    # Splits "A vs B" / "A vs. B" in one scan instead of separate
+    # membership checks per separator variant
+    _MATCHUP_SPLIT_RE = re.compile(r'\s+vs\.?\s+')
     # Additional sports tags for broader coverage
     # Expanded tags for better market coverage:
     # 64: Esports, 65: Esports, 450: Sports, 745: NBA, 899: NFL, 
@@ -43,7 +68,20 @@ class PolymarketAPI:
                    "102372", "102373", "102374", "102375", "102376", "103000", "103001"]
 
     def __init__(self):
+        # Pooled session so repeated tag fetches reuse TCP+TLS connections
         self.session = requests.Session()
+        self.session.headers.update({'Accept': 'application/json'})
+        self.session.mount("https://", HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=32,
+            max_retries=Retry(total=2, backoff_factor=0.3)
+        ))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.session.close()
 
     def get_market(self, market_id: str) -> Dict:
         """Get market details by ID"""
@@ -97,6 +135,50 @@ class PolymarketAPI:
 
         return all_events
 
+    def get_events_by_tags(self, tag_ids: List[str], limit: int = 1000) -> List[Dict]:
+        """
+        Get events for several tag IDs in one query.
+
+        The Gamma API accepts a comma-joined tag_id filter and returns a
+        merged, server-deduplicated result set, so this replaces one HTTP
+        round-trip per tag with one per page.
+        """
+        all_events = []
+        offset = 0
+        batch_size = 100
+        tag_filter = ",".join(tag_ids)
+
+        print(f"Fetching Polymarket events for {len(tag_ids)} tags...")
+
+        while len(all_events) < limit:
+            url = f"{self.BASE_URL}/events"
+            params = {
+                'closed': 'false',
+                'tag_id': tag_filter,
+                'limit': batch_size,
+                'offset': offset
+            }
+
+            try:
+                response = self.session.get(url, params=params, timeout=10)
+                response.raise_for_status()
+                events = response.json()
+
+                if not events:
+                    break
+
+                all_events.extend(events)
+                offset += len(events)
+
+                if len(events) < batch_size:
+                    break
+
+            except requests.RequestException as e:
+                print(f"Error fetching batch at offset {offset}: {e}")
+                break
+
+        return all_events
+
     def get_all_events(self, limit: int = 500) -> List[Dict]:
         """
         Get all active events from Polymarket
@@ -217,52 +299,42 @@ class PolymarketAPI:
 
             # Parse outcomes and prices
             try:
-                import math
-                outcomes = json.loads(winner_market.get('outcomes', '[]'))
-                prices = json.loads(winner_market.get('outcomePrices', '[]'))
+                outcomes = json_loads(winner_market.get('outcomes') or '[]')
+                prices = json_loads(winner_market.get('outcomePrices') or '[]')
 
                 if len(outcomes) != 2 or len(prices) != 2:
                     continue
 
-                # Process outcomes in their original order
+                # Process outcomes in their original order as (code, raw)
+                # tuples - no per-outcome dict allocation needed
                 outcome_data = []
                 for outcome, price in zip(outcomes, prices):
                     team_code = normalize_team_name(outcome, 'polymarket')
                     if team_code:
-                        outcome_data.append({
-                            'code': team_code,
-                            'raw_prob': float(price) * 100
-                        })
+                        outcome_data.append((team_code, float(price) * 100))
 
                 if len(outcome_data) != 2:
                     continue
 
                 # Normalize probabilities - give remainder to SMALLER value
-                prob1 = outcome_data[0]['raw_prob']
-                prob2 = outcome_data[1]['raw_prob']
+                code1, prob1 = outcome_data[0]
+                code2, prob2 = outcome_data[1]
 
-                floor1 = math.floor(prob1)
-                floor2 = math.floor(prob2)
+                floor1 = int(prob1)
+                floor2 = int(prob2)
                 remainder = 100 - (floor1 + floor2)
 
                 # Give remainder to the SMALLER raw probability
                 if prob1 <= prob2:
-                    outcome_data[0]['prob'] = floor1 + remainder
-                    outcome_data[1]['prob'] = floor2
+                    final1 = floor1 + remainder
+                    final2 = floor2
                 else:
-                    outcome_data[0]['prob'] = floor1
-                    outcome_data[1]['prob'] = floor2 + remainder
+                    final1 = floor1
+                    final2 = floor2 + remainder
 
                 # Map to team codes
-                probs = {
-                    outcome_data[0]['code']: outcome_data[0]['prob'],
-                    outcome_data[1]['code']: outcome_data[1]['prob']
-                }
-                
-                raw_probs = {
-                    outcome_data[0]['code']: outcome_data[0]['raw_prob'],
-                    outcome_data[1]['code']: outcome_data[1]['raw_prob']
-                }
+                probs = {code1: final1, code2: final2}
+                raw_probs = {code1: prob1, code2: prob2}
 
                 game_data = {
                     'platform': 'Polymarket',
@@ -278,15 +350,18 @@ class PolymarketAPI:
                     'slug': slug,
                     'end_date': winner_market.get('endDate', ''),
                     'start_date': event.get('startDate', ''),
-                    'url': f'https://polymarket.com/event/{slug}',
                 }
 
                 games.append(game_data)
 
             except (json.JSONDecodeError, ValueError) as e:
-                print(f"Error parsing market data for {title}: {e}")
+                logger.debug("Error parsing market data for %s: %s", title, e)
                 continue
 
+        # URL construction deferred to one pass over the finished list
+        for game_data in games:
+            game_data['url'] = 'https://polymarket.com/event/' + game_data['slug']
+
         return games
 
     def get_today_games(self) -> List[Dict]:
@@ -295,32 +370,45 @@ class PolymarketAPI:
         today = datetime.now().strftime('%Y-%m-%d')
         return self.get_nba_games(date_filter=today)
 
-    def get_all_sports_games(self) -> List[Dict]:
+    def iter_all_sports_games(self):
         """
-        Get games from all sports categories for broader market coverage
-        Expanded limits to ensure we meet minimum requirements
+        Yield games from all sports categories as events are processed.
+
+        Generator form keeps peak memory at one event's worth of games and
+        lets callers that filter start consuming before the full sweep is
+        parsed.
         """
-        all_games = []
         seen_events = set()  # Avoid duplicates
 
-        for tag_id in self.SPORTS_TAGS:
-            try:
-                # Increased limit from 300 to 500 for better coverage
-                events = self.get_events_by_tag(tag_id, limit=500)
-                for event in events:
-                    event_id = event.get('id')
-                    if event_id in seen_events:
-                        continue
-                    seen_events.add(event_id)
-
-                    # Process similar to get_nba_games but for all sports
-                    games = self._process_event_for_all_sports(event)
-                    all_games.extend(games)
+        # One batched tag_id query replaces the per-tag fan-out: the server
+        # merges and dedups the tag result sets, so the client pays one HTTP
+        # round-trip per page instead of one per tag
+        events = self.get_events_by_tags(self.SPORTS_TAGS, limit=1000)
+
+        for event in events:
+            event_id = event.get('id')
+            # One hash per event: add() and compare sizes instead of a
+            # membership probe followed by a second insert probe
+            n_seen = len(seen_events)
+            seen_events.add(event_id)
+            if len(seen_events) == n_seen:
+                continue
 
+            try:
+                # Process similar to get_nba_games but for all sports
+                games = self._process_event_for_all_sports(event)
             except Exception as e:
-                print(f"Error processing tag {tag_id}: {e}")
+                print(f"Error processing event {event_id}: {e}")
                 continue
 
+            yield from games
+
+    def get_all_sports_games(self) -> List[Dict]:
+        """
+        Get games from all sports categories for broader market coverage
+        Expanded limits to ensure we meet minimum requirements
+        """
+        all_games = list(self.iter_all_sports_games())
         print(f"Total Polymarket games collected: {len(all_games)}")
         return all_games
 
@@ -332,21 +420,11 @@ class PolymarketAPI:
         title = event.get('title', '')
         slug = event.get('slug', '')
 
-        # Skip if not a vs match
-        if ' vs ' not in title and ' vs. ' not in title:
-            return games
+        # Strip common league prefixes in one anchored sub
+        clean_title = self._LEAGUE_PREFIX_RE.sub('', title, count=1)
 
-        # Common prefixes to strip
-        prefixes_to_strip = ['NBA:', 'NFL:', 'NHL:', 'EPL:', 'LoL:', 'CS2:', 'Dota 2:', 'Valorant:', 'MLB:']
-        clean_title = title
-        for prefix in prefixes_to_strip:
-            if clean_title.startswith(prefix):
-                clean_title = clean_title[len(prefix):].strip()
-                break
-
-        # Extract team names
-        separator = ' vs. ' if ' vs. ' in clean_title else ' vs '
-        teams = clean_title.split(separator)
+        # Extract team names; a non-matchup title yields a single part
+        teams = self._MATCHUP_SPLIT_RE.split(clean_title)
         if len(teams) != 2:
             return games
 
@@ -362,7 +440,8 @@ class PolymarketAPI:
             away_code = away_team
             home_code = home_team
 
-        # Find the primary winner market
+        # Find the primary winner market; prefer an exact title match but
+        # remember the first Winner/Moneyline fallback seen
         winner_market = None
         for market in event.get('markets', []):
             question = market.get('question', '')
@@ -370,59 +449,44 @@ class PolymarketAPI:
             if question == clean_title or question == title:
                 winner_market = market
                 break
-            # Fallback to winner/moneyline markets
-            if ('Winner' in question or 'Moneyline' in question) and '1H' not in question and 'Map' not in question:
-                if not winner_market:  # Take first match
-                    winner_market = market
+            # Fallback predicate only runs until a candidate is found
+            if winner_market is None and self._FALLBACK_WINNER_RE.match(question):
+                winner_market = market
 
         if not winner_market:
             return games
 
         # Parse outcomes and prices
         try:
-            outcomes = json.loads(winner_market.get('outcomes', '[]'))
-            prices = json.loads(winner_market.get('outcomePrices', '[]'))
+            outcomes = json_loads(winner_market.get('outcomes') or '[]')
+            prices = json_loads(winner_market.get('outcomePrices') or '[]')
 
             if len(outcomes) != 2 or len(prices) != 2:
                 return games
 
-            # Process outcomes
-            outcome_data = []
-            for outcome, price in zip(outcomes, prices):
-                team_code = normalize_team_name(outcome, 'polymarket') or outcome
-                outcome_data.append({
-                    'code': team_code,
-                    'raw_prob': float(price) * 100
-                })
-
-            if len(outcome_data) != 2:
-                return games
+            # Process outcomes - exactly two (checked above), so unroll the
+            # zip loop into plain locals with no intermediate allocations
+            code1 = normalize_team_name(outcomes[0], 'polymarket') or outcomes[0]
+            code2 = normalize_team_name(outcomes[1], 'polymarket') or outcomes[1]
+            prob1 = float(prices[0]) * 100
+            prob2 = float(prices[1]) * 100
 
             # Normalize probabilities
-            prob1 = outcome_data[0]['raw_prob']
-            prob2 = outcome_data[1]['raw_prob']
-            floor1 = math.floor(prob1)
-            floor2 = math.floor(prob2)
+            floor1 = int(prob1)
+            floor2 = int(prob2)
             remainder = 100 - (floor1 + floor2)
 
             # Give remainder to smaller probability
             if prob1 <= prob2:
-                outcome_data[0]['prob'] = floor1 + remainder
-                outcome_data[1]['prob'] = floor2
+                final1 = floor1 + remainder
+                final2 = floor2
             else:
-                outcome_data[0]['prob'] = floor1
-                outcome_data[1]['prob'] = floor2 + remainder
+                final1 = floor1
+                final2 = floor2 + remainder
 
             # Map to team codes
-            probs = {
-                outcome_data[0]['code']: outcome_data[0]['prob'],
-                outcome_data[1]['code']: outcome_data[1]['prob']
-            }
-            
-            raw_probs = {
-                outcome_data[0]['code']: outcome_data[0]['raw_prob'],
-                outcome_data[1]['code']: outcome_data[1]['raw_prob']
-            }
+            probs = {code1: final1, code2: final2}
+            raw_probs = {code1: prob1, code2: prob2}
 
             game_data = {
                 'platform': 'Polymarket',
@@ -445,7 +509,7 @@ class PolymarketAPI:
             games.append(game_data)
 
         except (json.JSONDecodeError, ValueError) as e:
-            print(f"Error parsing market data for {title}: {e}")
+            logger.debug("Error parsing market data for %s: %s", title, e)
 
         return games
 
@@ -0,0 +1,36 @@
+"""Shared probability rounding for the per-platform API clients."""
+
+
+
+def round_two(away_raw, home_raw):
+    """
+    Normalize two raw prices to integer percentages summing to exactly 100.
+
+    Straight-line code specialized for the fixed two-outcome shape: the
+    remainder left over after flooring goes to the smaller raw value, chosen
+    with a branchless selector instead of an if/else.
+    """
+    total = away_raw + home_raw
+    if total <= 0:
+        return 0, 0
+
+    away_pct = (away_raw / total) * 100
+    home_pct = (home_raw / total) * 100
+
+    away_floor = int(away_pct)
+    home_floor = int(home_pct)
+    remainder = 100 - (away_floor + home_floor)
+
+    add_to_away = int(away_raw <= home_raw)
+    return (away_floor + remainder * add_to_away,
+            home_floor + remainder * (1 - add_to_away))
+
+
+try:
+    # Optional: compile the rounding kernel to native code when numba is
+    # installed; cache=True pays the compile cost only once per machine.
+    # Falls back to the pure-Python helper otherwise.
+    from numba import njit
+    round_two = njit(cache=True)(round_two)
+except ImportError:
+    pass
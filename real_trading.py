@@ -4,15 +4,127 @@ Executes live trades on Kalshi and Polymarket platforms
 Includes comprehensive risk controls and error handling
 """
 
+import atexit
 import json
 import os
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from collections import defaultdict
+from collections import defaultdict, deque
 import requests
+from requests.adapters import HTTPAdapter, Retry
 from typing import Dict, Tuple, Optional, List
 
 REAL_TRADING_DATA_FILE = 'real_trading_data.json'
 
+# Append-only event ledger between snapshots: each trade/settlement/error
+# appends one line here instead of rewriting the whole data file, and the
+# ledger is replayed on top of the snapshot at load (same design as the
+# paper-trading log)
+REAL_TRADING_LOG = 'real_trading_data.ndjson'
+
+# Terminal bets past the retention window move here (one JSON line per
+# bet) so snapshot size and replay cost track live state, not lifetime
+# history
+REAL_TRADING_ARCHIVE = 'real_trading_archive.ndjson'
+
+# Events appended between full snapshots before the next snapshot runs
+SNAPSHOT_EVERY = 200
+
+# Bounded error-log length; a deque(maxlen=...) evicts the oldest entry in
+# O(1) instead of rebuilding the list on every append
+MAX_ERRORS = 100
+
+# orjson (optional) emits bytes directly from a C serializer; the stdlib
+# fallback keeps the same compact wire format
+try:
+    from orjson import dumps as _json_dumps_bytes, loads as _json_loads
+except ImportError:
+    def _json_dumps_bytes(obj):
+        return json.dumps(obj, separators=(',', ':')).encode()
+    _json_loads = json.loads
+
+
+# Per-platform dispatch for execute_arb: (game-dict key, away-leg market-id
+# keys in fallback order, home-leg market-id keys). One hash probe replaces
+# the repeated string comparisons on the per-game scan path.
+_PLATFORM_MARKET_KEYS = {
+    'Polymarket': ('polymarket', ('away_market_id', 'market_id'), ('home_market_id', 'market_id')),
+    'Kalshi': ('kalshi', ('away_ticker', 'away_market_id'), ('home_ticker', 'home_market_id')),
+}
+
+
+def _order_validation_error(quantity: float, away_price: float, home_price: float) -> str:
+    """Build the rejection message for an invalid order parameter.
+
+    Only called on the failure path so the hot path pays for one compound
+    check instead of three branches plus their f-strings.
+    """
+    if quantity <= 0:
+        return f"Invalid quantity: {quantity} (must be > 0)"
+    if not (0.0 < away_price < 1.0):
+        return f"Invalid away price: {away_price} (must be between 0 and 1)"
+    return f"Invalid home price: {home_price} (must be between 0 and 1)"
+
+
+def _to_cents(price: float) -> int:
+    """Convert a 0-1 price to integer cents, rounded and clamped to 1-99.
+
+    A bare int(price * 100) truncates, so floats like 0.29 (stored as
+    0.28999...) become 28 cents and the order gets rejected or misfiled.
+    Rounding first removes that class of off-by-one; clamping keeps the
+    result inside Kalshi's valid contract price range.
+    """
+    return max(1, min(99, int(round(price * 100))))
+
+
+# TCP keepalive on pooled connections: settlement polling can idle longer
+# than middlebox/NAT timeouts between sweeps, and a silently dropped
+# connection costs a fresh TCP+TLS handshake (or a hung request) on the
+# next poll. Probe idle connections so they stay pinned open or fail
+# fast. The per-option constants are platform-guarded; macOS spells
+# TCP_KEEPIDLE as TCP_KEEPALIVE.
+_KEEPALIVE_SOCKET_OPTIONS = [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+for _name, _value in (('TCP_KEEPIDLE', 60), ('TCP_KEEPALIVE', 60),
+                      ('TCP_KEEPINTVL', 30), ('TCP_KEEPCNT', 3)):
+    if hasattr(socket, _name):
+        _KEEPALIVE_SOCKET_OPTIONS.append((socket.IPPROTO_TCP, getattr(socket, _name), _value))
+
+
+class _KeepAliveAdapter(HTTPAdapter):
+    """HTTPAdapter that applies the keepalive options to new sockets."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs.setdefault('socket_options', _KEEPALIVE_SOCKET_OPTIONS)
+        super().init_poolmanager(*args, **kwargs)
+
+
+def _build_session() -> requests.Session:
+    """Session with a tuned connection pool shared by both trading clients.
+
+    Order placement and status polling hit the same origin repeatedly;
+    a larger keep-alive pool avoids per-call TLS handshakes, and
+    transient gateway errors on idempotent calls are retried with a
+    short backoff.
+    """
+    session = requests.Session()
+    adapter = _KeepAliveAdapter(
+        pool_connections=32,
+        pool_maxsize=64,
+        pool_block=False,
+        max_retries=Retry(
+            total=2,
+            backoff_factor=0.1,
+            status_forcelist=(429, 502, 503, 504),
+            allowed_methods=('GET', 'DELETE')
+        )
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
 
 class PolymarketTradingClient:
     """Client for executing orders on Polymarket"""
@@ -26,11 +138,14 @@ class PolymarketTradingClient:
         """
         self.api_key = api_key or os.environ.get('POLYMARKET_API_KEY')
         self.private_key = private_key or os.environ.get('POLYMARKET_PRIVATE_KEY')
-        self.session = requests.Session()
+        self.session = _build_session()
         self.session.timeout = 10
         self.session.headers.update({
             'User-Agent': 'PolyMix-RealTrader/1.0'
         })
+        # Auth never changes per call; build the header dicts once
+        self._auth_headers = {'Authorization': f'Bearer {self.api_key}'}
+        self._post_headers = {**self._auth_headers, 'Content-Type': 'application/json'}
         
     def place_order(self, market_id: str, side: str, amount: float, price: float) -> Dict:
         """
@@ -62,16 +177,13 @@ class PolymarketTradingClient:
                 'orderType': 'limit'
             }
             
-            headers = {
-                'Authorization': f'Bearer {self.api_key}',
-                'Content-Type': 'application/json'
-            }
-            
+            headers = self._post_headers
+
             url = f"{self.BASE_URL}/orders"
-            response = self.session.post(url, json=payload, headers=headers, timeout=10)
+            response = self.session.post(url, data=_json_dumps_bytes(payload), headers=headers, timeout=10)
             response.raise_for_status()
-            
-            data = response.json()
+
+            data = _json_loads(response.content)
             return {
                 'success': True,
                 'order_id': data.get('id'),
@@ -93,7 +205,7 @@ class PolymarketTradingClient:
             if not self.api_key:
                 return {'success': False, 'error': 'POLYMARKET_API_KEY not configured'}
             
-            headers = {'Authorization': f'Bearer {self.api_key}'}
+            headers = self._auth_headers
             url = f"{self.BASE_URL}/orders/{order_id}"
             
             response = self.session.delete(url, headers=headers, timeout=10)
@@ -113,13 +225,13 @@ class PolymarketTradingClient:
             if not self.api_key:
                 return {'success': False, 'error': 'POLYMARKET_API_KEY not configured'}
             
-            headers = {'Authorization': f'Bearer {self.api_key}'}
+            headers = self._auth_headers
             url = f"{self.BASE_URL}/orders/{order_id}"
             
             response = self.session.get(url, headers=headers, timeout=10)
             response.raise_for_status()
             
-            data = response.json()
+            data = _json_loads(response.content)
             return {
                 'success': True,
                 'status': data.get('status'),
@@ -137,7 +249,7 @@ class PolymarketTradingClient:
             if not self.api_key:
                 return []
             
-            headers = {'Authorization': f'Bearer {self.api_key}'}
+            headers = self._auth_headers
             url = f"{self.BASE_URL}/fills"
             params = {'limit': limit}
             
@@ -147,7 +259,9 @@ class PolymarketTradingClient:
             response = self.session.get(url, headers=headers, params=params, timeout=10)
             response.raise_for_status()
             
-            fills = response.json().get('fills', [])
+            # Polled frequently with limit=100: parse with orjson when
+            # available instead of the stdlib decoder behind response.json()
+            fills = _json_loads(response.content).get('fills', [])
             return fills
             
         except Exception as e:
@@ -167,11 +281,14 @@ class KalshiTradingClient:
         """
         self.api_key = api_key or os.environ.get('KALSHI_API_KEY')
         self.secret = secret or os.environ.get('KALSHI_SECRET')
-        self.session = requests.Session()
+        self.session = _build_session()
         self.session.timeout = 10
         self.session.headers.update({
             'User-Agent': 'PolyMix-RealTrader/1.0'
         })
+        # Auth never changes per call; build the header dicts once
+        self._auth_headers = {'Authorization': f'Bearer {self.api_key}'}
+        self._post_headers = {**self._auth_headers, 'Content-Type': 'application/json'}
         
     def place_order(self, ticker: str, side: str, amount: float, price: float, 
                     order_type: str = 'limit') -> Dict:
@@ -201,20 +318,17 @@ class KalshiTradingClient:
                 'ticker': ticker,
                 'side': side,  # 'Yes' or 'No'
                 'count': int(amount),  # Kalshi uses count (shares)
-                'price': int(price * 100),  # Convert to cents
+                'price': _to_cents(price),
                 'type': order_type
             }
             
-            headers = {
-                'Authorization': f'Bearer {self.api_key}',
-                'Content-Type': 'application/json'
-            }
-            
+            headers = self._post_headers
+
             url = f"{self.BASE_URL}/orders"
-            response = self.session.post(url, json=payload, headers=headers, timeout=10)
+            response = self.session.post(url, data=_json_dumps_bytes(payload), headers=headers, timeout=10)
             response.raise_for_status()
-            
-            data = response.json().get('order', {})
+
+            data = _json_loads(response.content).get('order', {})
             return {
                 'success': True,
                 'order_id': data.get('order_id'),
@@ -236,7 +350,7 @@ class KalshiTradingClient:
             if not self.api_key:
                 return {'success': False, 'error': 'KALSHI_API_KEY not configured'}
             
-            headers = {'Authorization': f'Bearer {self.api_key}'}
+            headers = self._auth_headers
             url = f"{self.BASE_URL}/orders/{order_id}"
             
             response = self.session.delete(url, headers=headers, timeout=10)
@@ -256,13 +370,13 @@ class KalshiTradingClient:
             if not self.api_key:
                 return {'success': False, 'error': 'KALSHI_API_KEY not configured'}
             
-            headers = {'Authorization': f'Bearer {self.api_key}'}
+            headers = self._auth_headers
             url = f"{self.BASE_URL}/orders/{order_id}"
             
             response = self.session.get(url, headers=headers, timeout=10)
             response.raise_for_status()
             
-            data = response.json().get('order', {})
+            data = _json_loads(response.content).get('order', {})
             return {
                 'success': True,
                 'status': data.get('status'),
@@ -279,7 +393,7 @@ class KalshiTradingClient:
             if not self.api_key:
                 return []
             
-            headers = {'Authorization': f'Bearer {self.api_key}'}
+            headers = self._auth_headers
             url = f"{self.BASE_URL}/fills"
             params = {'limit': limit}
             
@@ -289,7 +403,9 @@ class KalshiTradingClient:
             response = self.session.get(url, headers=headers, params=params, timeout=10)
             response.raise_for_status()
             
-            fills = response.json().get('fills', [])
+            # Polled frequently with limit=100: parse with orjson when
+            # available instead of the stdlib decoder behind response.json()
+            fills = _json_loads(response.content).get('fills', [])
             return fills
             
         except Exception as e:
@@ -306,6 +422,28 @@ class RealTradingSystem:
     def __init__(self):
         self.polymarket_client = PolymarketTradingClient()
         self.kalshi_client = KalshiTradingClient()
+        # Leg orders dispatch on platform name via these tables instead of
+        # if/elif string comparisons (both clients take the market id first)
+        self._place_order_for = {
+            'Polymarket': self.polymarket_client.place_order,
+            'Kalshi': self.kalshi_client.place_order,
+        }
+        self._cancel_order_for = {
+            'Polymarket': self.polymarket_client.cancel_order,
+            'Kalshi': self.kalshi_client.cancel_order,
+        }
+        self._today_epoch_day = -1
+        self._today_iso = ''
+        self._save_lock = threading.Lock()
+        self._trade_lock = threading.Lock()
+        self._log_lock = threading.Lock()
+        # Serializes bookkeeping mutations of self.data and the derived
+        # indexes; HTTP calls are made outside it
+        self._state_lock = threading.RLock()
+        self._events_since_snapshot = 0
+        atexit.register(self.flush)
+        # Both arbitrage legs are placed in parallel; one worker per leg
+        self._order_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='leg-order')
         self.load_data()
         
         # Risk controls
@@ -323,16 +461,44 @@ class RealTradingSystem:
             self.max_daily_trades = int(os.environ.get('LIVE_TRADING_MAX_DAILY_TRADES', 10))
         except:
             self.max_daily_trades = 10
+
+        # Trade sizing/thresholds, read once: env vars don't change while
+        # the process runs, and execute_arb is called per scanned game
+        try:
+            self.target_units = float(os.environ.get('LIVE_TRADING_BET_AMOUNT', 100))
+        except:
+            self.target_units = 100.0
+
+        try:
+            self.min_roi = float(os.environ.get('LIVE_TRADING_MIN_ROI', 0))
+        except:
+            self.min_roi = 0.0
+
+        try:
+            self.status_cache_ttl = float(os.environ.get('LIVE_TRADING_STATUS_CACHE_TTL', 30))
+        except:
+            self.status_cache_ttl = 30.0
+        # Unresolved market statuses, keyed (platform, market_id) ->
+        # (monotonic timestamp, status); entries expire after the TTL
+        self._status_cache = {}
+
+        # Settled/incomplete bets older than this many days are moved to
+        # the archive file (0 keeps everything in the snapshot)
+        try:
+            self.archive_after_days = float(os.environ.get('LIVE_TRADING_ARCHIVE_AFTER_DAYS', 30))
+        except:
+            self.archive_after_days = 30.0
+        self._archive_old_bets()
     
     def load_data(self):
         """Load trading data from persistent storage"""
         if os.path.exists(REAL_TRADING_DATA_FILE):
             try:
-                with open(REAL_TRADING_DATA_FILE, 'r') as f:
-                    self.data = json.load(f)
+                with open(REAL_TRADING_DATA_FILE, 'rb') as f:
+                    self.data = _json_loads(f.read())
                 
                 # Migrate old data format if needed
-                today = datetime.now().date().isoformat()
+                today = self._today()
                 if 'last_daily_reset_date' not in self.data:
                     self.data['last_daily_reset_date'] = today
                 if 'daily_loss' not in self.data:
@@ -341,12 +507,119 @@ class RealTradingSystem:
                     self.data['daily_trades'] = []
                 if 'errors' not in self.data:
                     self.data['errors'] = []
-                    
+                self.data['errors'] = deque(self.data['errors'], maxlen=MAX_ERRORS)
+                self.data.setdefault('archived_count', 0)
+                self.data.setdefault('archived_realized', 0.0)
+
+
             except Exception as e:
                 print(f"Error loading trading data: {e}. Resetting...")
                 self.reset_data()
         else:
             self.reset_data()
+        self._replay_log()
+        self._build_indexes()
+
+    def _replay_log(self):
+        """Apply ledger events appended since the last snapshot."""
+        if not os.path.exists(REAL_TRADING_LOG):
+            return
+        replayed = 0
+        by_id = None
+        try:
+            with open(REAL_TRADING_LOG, 'rb') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    event = _json_loads(line)
+                    kind = event.get('k')
+                    payload = event.get('p')
+                    if kind == 'trade':
+                        self.data['bets'].append(payload)
+                        if by_id is not None:
+                            by_id[payload['id']] = payload
+                    elif kind == 'daily':
+                        self.data['daily_trades'].append(payload)
+                    elif kind == 'bal':
+                        self.data['balance'] = payload
+                    elif kind == 'settle':
+                        if by_id is None:
+                            by_id = {b['id']: b for b in self.data['bets']}
+                        bet = by_id.get(payload.get('id'))
+                        if bet is not None:
+                            bet.update(payload.get('fields', {}))
+                        if 'daily_loss' in payload:
+                            self.data['daily_loss'] = payload['daily_loss']
+                    elif kind == 'error':
+                        self.data['errors'].append(payload)
+                    replayed += 1
+        except Exception as e:
+            print(f"Error replaying trade ledger: {e}")
+        self._events_since_snapshot = replayed
+
+    def _append_event(self, kind, payload):
+        """Append one event line to the ledger; snapshot every SNAPSHOT_EVERY.
+
+        An append is O(event) where a snapshot is O(total state), so the
+        hot paths pay for what they changed and the periodic snapshot
+        bounds replay time at the next start."""
+        line = _json_dumps_bytes({'k': kind, 'p': payload}) + b'\n'
+        with self._log_lock:
+            with open(REAL_TRADING_LOG, 'ab') as f:
+                f.write(line)
+            self._events_since_snapshot += 1
+            snapshot_due = self._events_since_snapshot >= SNAPSHOT_EVERY
+        if snapshot_due:
+            self.save_data()
+
+    def _drop_pending(self, bet):
+        """Remove a bet from the pending worklist (swap-with-last, O(1) pop)."""
+        try:
+            i = self._pending_bets.index(bet)
+        except ValueError:
+            return
+        last = self._pending_bets.pop()
+        if last is not bet:
+            self._pending_bets[i] = last
+
+    def _today(self) -> str:
+        """Today's date as an ISO string, cached until the day rolls over.
+
+        datetime.now().date().isoformat() allocates several objects and
+        formats a string on every call; the risk checks only need the
+        result to change once a day, so gate the rebuild on the integer
+        epoch-day instead.
+        """
+        epoch_day = time.time_ns() // 86_400_000_000_000
+        if epoch_day != self._today_epoch_day:
+            self._today_iso = datetime.utcfromtimestamp(epoch_day * 86400).date().isoformat()
+            self._today_epoch_day = epoch_day
+        return self._today_iso
+
+    def _build_indexes(self):
+        """One pass over history to seed the incremental aggregates.
+
+        Mutation points keep these current so _check_risk_controls and
+        get_state never rescan the growing bet/trade lists.
+        """
+        self._daily_trade_count = defaultdict(int)
+        for t in self.data.get('daily_trades', []):
+            self._daily_trade_count[t.get('date')] += 1
+        # Realized profit carried by archived bets lives in the offset,
+        # so moving bets to the archive never moves the reported total
+        self._total_realized = self.data.get('archived_realized', 0.0)
+        self._total_estimated = 0.0
+        self._active_bets = set()
+        self._pending_bets = []
+        for bet in self.data['bets']:
+            if bet['status'] == 'settled':
+                self._total_realized += bet.get('realized_profit', 0.0)
+            elif bet['status'] == 'pending':
+                self._total_estimated += bet.get('profit', 0.0)
+                self._pending_bets.append(bet)
+            if bet['status'] in ('pending', 'locked'):
+                self._active_bets.add(bet['id'])
     
     def reset_data(self):
         """Initialize new trading data"""
@@ -354,8 +627,8 @@ class RealTradingSystem:
             initial_balance = float(os.environ.get('LIVE_TRADING_INITIAL_BALANCE', 10000))
         except:
             initial_balance = 10000.0
-        
-        today = datetime.now().date().isoformat()
+
+        today = self._today()
         
         self.data = {
             'balance': initial_balance,
@@ -365,39 +638,99 @@ class RealTradingSystem:
             'daily_trades': [],
             'daily_loss': 0.0,
             'last_daily_reset_date': today,
-            'errors': []
+            'errors': deque(maxlen=MAX_ERRORS),
+            'archived_count': 0,
+            'archived_realized': 0.0
         }
         self.save_data()
     
     def save_data(self):
-        """Save trading data to persistent storage"""
-        with open(REAL_TRADING_DATA_FILE, 'w') as f:
-            json.dump(self.data, f, indent=4)
+        """Save trading data to persistent storage.
+
+        Serialized compactly (orjson when available) and written to a
+        temp file that is renamed into place, so a crash mid-write can
+        never leave a torn file that load_data would reset.
+        """
+        with self._save_lock:
+            # errors is a deque; JSON needs a list view
+            payload = _json_dumps_bytes({**self.data, 'errors': list(self.data['errors'])})
+            tmp = REAL_TRADING_DATA_FILE + '.tmp'
+            with open(tmp, 'wb') as f:
+                f.write(payload)
+            os.replace(tmp, REAL_TRADING_DATA_FILE)
+            # The snapshot covers everything in the ledger; truncate it
+            with self._log_lock:
+                with open(REAL_TRADING_LOG, 'wb'):
+                    pass
+                self._events_since_snapshot = 0
     
+    def flush(self):
+        """Snapshot current state and truncate the ledger (runs at exit)."""
+        self.save_data()
+
+    def _archive_old_bets(self):
+        """Move old settled bets past the retention window to the archive file.
+
+        Every snapshot re-encodes all of self.data['bets'], so lifetime
+        history makes persistence cost grow without bound. Settled bets
+        older than archive_after_days are appended to the archive ledger
+        and dropped from the live list; their count and realized profit
+        are folded into running offsets so get_state totals are
+        unchanged. Only 'settled' bets qualify: _build_indexes counts
+        just those toward _total_realized, so folding an incomplete
+        bet's realized_profit into the offset would shift total_profit
+        on the next restart. Runs at startup and after settlements.
+        """
+        days = self.archive_after_days
+        if days <= 0:
+            return
+        cutoff = time.time() - days * 86400.0
+        with self._state_lock:
+            keep = []
+            archived = []
+            for bet in self.data['bets']:
+                if bet.get('status') == 'settled':
+                    ts_epoch = bet.get('_ts_epoch')
+                    if ts_epoch is None:
+                        try:
+                            ts_epoch = datetime.fromisoformat(bet['timestamp']).timestamp()
+                        except (KeyError, TypeError, ValueError):
+                            ts_epoch = None
+                    if ts_epoch is not None and ts_epoch < cutoff:
+                        archived.append(bet)
+                        continue
+                keep.append(bet)
+            if not archived:
+                return
+            self.data['bets'] = keep
+            self.data['archived_count'] = self.data.get('archived_count', 0) + len(archived)
+            self.data['archived_realized'] = self.data.get('archived_realized', 0.0) + \
+                sum(b.get('realized_profit', 0.0) for b in archived)
+        # Archive first, then snapshot: a crash in between can duplicate a
+        # bet into the archive on the next pass, but can never lose one
+        with open(REAL_TRADING_ARCHIVE, 'ab') as f:
+            f.write(b''.join(_json_dumps_bytes(b) + b'\n' for b in archived))
+        self.save_data()
+
     def get_state(self):
         """Get current trading state"""
-        total_trades = len(self.data['bets'])
-        total_profit = sum(bet.get('realized_profit', 0.0) for bet in self.data['bets'] if bet['status'] == 'settled')
-        estimated_profit = sum(bet.get('profit', 0.0) for bet in self.data['bets'] if bet['status'] == 'pending')
-        current_balance = self.data['balance']
-        
-        sorted_bets = sorted(self.data['bets'], key=lambda x: x['timestamp'], reverse=True)
-        
+        # Aggregates are maintained incrementally; bets are appended in
+        # timestamp order so the reversed list is the newest-first view
         return {
-            'balance': current_balance,
+            'balance': self.data['balance'],
             'initial_balance': self.data['initial_balance'],
-            'total_profit': total_profit,
-            'estimated_profit': estimated_profit,
-            'total_trades': total_trades,
-            'bets': sorted_bets,
+            'total_profit': self._total_realized,
+            'estimated_profit': self._total_estimated,
+            'total_trades': len(self.data['bets']) + self.data.get('archived_count', 0),
+            'bets': self.data['bets'][::-1],
             'daily_loss': self.data.get('daily_loss', 0.0),
             'daily_trades': len(self.data.get('daily_trades', []))
         }
     
     def _check_risk_controls(self, total_cost: float) -> Tuple[bool, str]:
         """Check if trade violates risk controls"""
-        
-        today = datetime.now().date().isoformat()
+
+        today = self._today()
         
         # Reset daily metrics if date changed (daily reset at UTC midnight)
         last_reset_date = self.data.get('last_daily_reset_date')
@@ -405,12 +738,11 @@ class RealTradingSystem:
             self.data['daily_loss'] = 0.0
             self.data['daily_trades'] = []
             self.data['last_daily_reset_date'] = today
+            self._daily_trade_count.clear()
             # Don't save here; let caller decide
-        
-        # Check daily trade limit
-        daily_trades = [t for t in self.data.get('daily_trades', []) 
-                       if t.get('date') == today]
-        if len(daily_trades) >= self.max_daily_trades:
+
+        # Check daily trade limit (counter kept current at trade insertion)
+        if self._daily_trade_count[today] >= self.max_daily_trades:
             return False, f"Daily trade limit reached ({self.max_daily_trades})"
         
         # Check position size
@@ -434,30 +766,36 @@ class RealTradingSystem:
             return None
         
         if isinstance(details, dict) and 'bestAwayFrom' in details:
-            normalized = details.copy()
-            roi_percent = normalized.get('roiPercent')
-            if roi_percent is not None and normalized.get('roi') is None:
-                normalized['roi'] = roi_percent / 100
-            if normalized.get('roi') is not None and normalized.get('roiPercent') is None:
-                normalized['roiPercent'] = normalized['roi'] * 100
-            return normalized
-        
+            # Fast path: camelCase payloads normally carry both roi keys
+            # already, so return them untouched and only pay for a copy
+            # when one of the two has to be derived
+            roi = details.get('roi')
+            roi_percent = details.get('roiPercent')
+            if roi is not None and roi_percent is not None:
+                return details
+            if roi is None and roi_percent is not None:
+                return {**details, 'roi': roi_percent / 100}
+            if roi is not None and roi_percent is None:
+                return {**details, 'roiPercent': roi * 100}
+            return details
+
         if isinstance(details, dict) and 'best_away_platform' in details:
-            roi_percent = details.get('roi_percent')
+            g = details.get
+            roi_percent = g('roi_percent')
             return {
-                'bestAwayFrom': details.get('best_away_platform'),
-                'bestHomeFrom': details.get('best_home_platform'),
-                'bestAwayPrice': details.get('best_away_price'),
-                'bestHomePrice': details.get('best_home_price'),
-                'bestAwayEffective': details.get('best_away_effective'),
-                'bestHomeEffective': details.get('best_home_effective'),
-                'totalCost': details.get('total_cost'),
-                'edge': details.get('net_edge'),
-                'grossCost': details.get('gross_cost'),
-                'grossEdge': details.get('gross_edge'),
+                'bestAwayFrom': g('best_away_platform'),
+                'bestHomeFrom': g('best_home_platform'),
+                'bestAwayPrice': g('best_away_price'),
+                'bestHomePrice': g('best_home_price'),
+                'bestAwayEffective': g('best_away_effective'),
+                'bestHomeEffective': g('best_home_effective'),
+                'totalCost': g('total_cost'),
+                'edge': g('net_edge'),
+                'grossCost': g('gross_cost'),
+                'grossEdge': g('gross_edge'),
                 'roiPercent': roi_percent,
                 'roi': roi_percent / 100 if roi_percent is not None else None,
-                'fees': details.get('fees', {})
+                'fees': g('fees', {})
             }
         
         return None
@@ -468,8 +806,19 @@ class RealTradingSystem:
         Reuses paper trading logic but makes actual API calls
         """
         
+        # Fast reject: most scanned games carry no opportunity, so gate
+        # on the raw payload before normalization does any dict work.
+        # The edge key depends on the payload shape (camelCase scanner
+        # output vs snake_case internals).
+        raw = game.get('riskFreeArb') or game.get('risk_free_arb')
+        if not isinstance(raw, dict) or not raw:
+            return False, "No risk-free arbitrage opportunity"
+        edge = raw.get('edge') if 'bestAwayFrom' in raw else raw.get('net_edge')
+        if not edge or edge <= 0:
+            return False, "No risk-free arbitrage opportunity"
+
         # Same arbitrage detection logic as PaperTradingSystem
-        risk_detail = self._normalize_risk_details(game.get('riskFreeArb') or game.get('risk_free_arb'))
+        risk_detail = self._normalize_risk_details(raw)
         required_keys = ['bestAwayPrice', 'bestHomePrice', 'bestAwayEffective', 'bestHomeEffective', 'totalCost', 'edge']
         if risk_detail and any(risk_detail.get(k) is None for k in required_keys):
             risk_detail = None
@@ -486,21 +835,12 @@ class RealTradingSystem:
             if not poly or not kalshi:
                 return False, "Missing platform data"
             
-            try:
-                target_units = float(os.environ.get('LIVE_TRADING_BET_AMOUNT', 100))
-            except:
-                target_units = 100.0
-            
-            quantity = target_units
+            quantity = self.target_units
             total_cost_usd = (risk_detail['totalCost'] / 100.0) * quantity
             profit_usd = (risk_detail['edge'] / 100.0) * quantity
             roi_percent = risk_detail.get('roiPercent', 0)
-            
-            try:
-                min_roi = float(os.environ.get('LIVE_TRADING_MIN_ROI', 0))
-            except:
-                min_roi = 0.0
-            
+
+            min_roi = self.min_roi
             if roi_percent <= min_roi:
                 return False, f"ROI ({roi_percent:.2f}%) below threshold ({min_roi}%)"
             
@@ -511,10 +851,9 @@ class RealTradingSystem:
             
             game_id = f"{game.get('away_code')}@{game.get('home_code')}"
             
-            # Check for duplicate trades
-            for bet in self.data['bets']:
-                if bet['id'] == game_id and bet['status'] in ['pending', 'locked']:
-                    return False, "Market already traded"
+            # Check for duplicate trades against the live index
+            if game_id in self._active_bets:
+                return False, "Market already traded"
             
             # Prepare order details
             away_platform = risk_detail['bestAwayFrom']
@@ -523,59 +862,62 @@ class RealTradingSystem:
             if away_platform == home_platform:
                 return False, "Invalid arbitrage: both legs on same platform"
             
-            # Extract market IDs with fallback options
-            away_market_id = None
-            if away_platform == 'Polymarket':
-                away_market_id = poly.get('away_market_id') or poly.get('market_id')
-            else:  # Kalshi
-                away_market_id = kalshi.get('away_ticker') or kalshi.get('away_market_id')
-            
-            home_market_id = None
-            if home_platform == 'Polymarket':
-                home_market_id = poly.get('home_market_id') or poly.get('market_id')
-            else:  # Kalshi
-                home_market_id = kalshi.get('home_ticker') or kalshi.get('home_market_id')
+            # Extract market IDs with fallback options (anything that is
+            # not Polymarket falls back to the Kalshi keys, as before)
+            sources = {'polymarket': poly, 'kalshi': kalshi}
+            src_key, away_keys, _ = _PLATFORM_MARKET_KEYS.get(away_platform) or _PLATFORM_MARKET_KEYS['Kalshi']
+            away_src = sources[src_key]
+            away_market_id = next((away_src.get(k) for k in away_keys if away_src.get(k)), None)
+
+            src_key, _, home_keys = _PLATFORM_MARKET_KEYS.get(home_platform) or _PLATFORM_MARKET_KEYS['Kalshi']
+            home_src = sources[src_key]
+            home_market_id = next((home_src.get(k) for k in home_keys if home_src.get(k)), None)
             
             # Validate market IDs
-            if not away_market_id:
-                return False, f"Missing market ID for {away_platform} (away leg)"
-            if not home_market_id:
+            if not (away_market_id and home_market_id):
+                if not away_market_id:
+                    return False, f"Missing market ID for {away_platform} (away leg)"
                 return False, f"Missing market ID for {home_platform} (home leg)"
             
             best_away = {
                 'platform': away_platform,
                 'price': risk_detail['bestAwayPrice'],
+                'price_dollars': risk_detail['bestAwayPrice'] / 100.0,
                 'eff': risk_detail['bestAwayEffective'],
                 'team': game.get('away_team', 'Away'),
                 'code': game.get('away_code'),
                 'market_id': away_market_id,
-                'url': poly.get('url', '') if away_platform == 'Polymarket' else kalshi.get('url', ''),
+                'url': away_src.get('url', ''),
             }
             
             best_home = {
                 'platform': home_platform,
                 'price': risk_detail['bestHomePrice'],
+                'price_dollars': risk_detail['bestHomePrice'] / 100.0,
                 'eff': risk_detail['bestHomeEffective'],
                 'team': game.get('home_team', 'Home'),
                 'code': game.get('home_code'),
                 'market_id': home_market_id,
-                'url': poly.get('url', '') if home_platform == 'Polymarket' else kalshi.get('url', ''),
+                'url': home_src.get('url', ''),
             }
             
-            # Validate order parameters
-            if quantity <= 0:
-                return False, f"Invalid quantity: {quantity} (must be > 0)"
-            if not (0 < best_away['price'] < 1):
-                return False, f"Invalid away price: {best_away['price']} (must be between 0 and 1)"
-            if not (0 < best_home['price'] < 1):
-                return False, f"Invalid home price: {best_home['price']} (must be between 0 and 1)"
-            
-            # Execute orders on both platforms
+            # Validate order parameters (single compound guard; the message
+            # is only formatted when something is actually out of range)
+            away_price = best_away['price']
+            home_price = best_home['price']
+            if quantity <= 0 or not (0.0 < away_price < 1.0) or not (0.0 < home_price < 1.0):
+                return False, _order_validation_error(quantity, away_price, home_price)
+            
+            # Execute orders on both platforms (one clock read per trade;
+            # the epoch copy saves a fromisoformat parse at settlement)
+            now = datetime.now()
+            now_iso = now.isoformat()
             trade = {
                 'id': game_id,
                 'game': f"{game.get('away_team')} vs {game.get('home_team')}",
                 'sport': game.get('sport', 'unknown'),
-                'timestamp': datetime.now().isoformat(),
+                'timestamp': now_iso,
+                '_ts_epoch': now.timestamp(),
                 'game_time': game.get('game_time', '') or game.get('end_date', ''),
                 'quantity': quantity,
                 'cost': total_cost_usd,
@@ -587,38 +929,54 @@ class RealTradingSystem:
                 'order_ids': {}
             }
             
-            # Place away leg
-            away_success = self._place_leg_order(best_away, quantity, trade)
-            if not away_success:
-                return False, "Failed to place away leg order"
-            
-            # Place home leg
-            home_success = self._place_leg_order(best_home, quantity, trade)
-            if not home_success:
-                # Try to cancel away leg (important for atomicity)
-                self._cancel_leg_order(best_away, trade)
-                return False, "Failed to place home leg order (away leg cancelled)"
+            # Place both legs concurrently: serial placement doubles the
+            # window in which quotes can move between the two fills
+            away_future = self._order_pool.submit(self._place_leg_order, best_away, quantity, trade)
+            home_future = self._order_pool.submit(self._place_leg_order, best_home, quantity, trade)
+            away_success = away_future.result()
+            home_success = home_future.result()
+
+            if not (away_success and home_success):
+                # Cancel whichever leg filled (important for atomicity)
+                if away_success:
+                    self._cancel_leg_order(best_away, trade)
+                    return False, "Failed to place home leg order (away leg cancelled)"
+                if home_success:
+                    self._cancel_leg_order(best_home, trade)
+                    return False, "Failed to place away leg order (home leg cancelled)"
+                return False, "Failed to place both leg orders"
             
             # Record trade with error handling
             try:
-                self.data['bets'].append(trade)
-                self.data['balance'] -= total_cost_usd
-                
-                today = datetime.now().date().isoformat()
-                self.data['daily_trades'].append({
-                    'date': today,
-                    'id': game_id,
-                    'timestamp': datetime.now().isoformat()
-                })
-                
-                self.save_data()
+                with self._state_lock:
+                    self.data['bets'].append(trade)
+                    self.data['balance'] -= total_cost_usd
+                    self._total_estimated += profit_usd
+                    self._active_bets.add(game_id)
+                    self._pending_bets.append(trade)
+
+                    today = self._today()
+                    self.data['daily_trades'].append({
+                        'date': today,
+                        'id': game_id,
+                        'timestamp': now_iso
+                    })
+                    self._daily_trade_count[today] += 1
+
+                self._append_event('trade', trade)
+                self._append_event('daily', self.data['daily_trades'][-1])
+                self._append_event('bal', self.data['balance'])
                 return True, trade
             except Exception as e:
                 # Rollback: remove trade if save fails
-                if self.data['bets'] and self.data['bets'][-1]['id'] == game_id:
-                    self.data['bets'].pop()
-                    self.data['balance'] += total_cost_usd
-                
+                with self._state_lock:
+                    if self.data['bets'] and self.data['bets'][-1]['id'] == game_id:
+                        self.data['bets'].pop()
+                        self.data['balance'] += total_cost_usd
+                        self._total_estimated -= profit_usd
+                        self._active_bets.discard(game_id)
+                        self._drop_pending(trade)
+
                 error_msg = f"Failed to save trade: {str(e)}"
                 self._record_error(game_id, error_msg)
                 return False, error_msg
@@ -628,61 +986,54 @@ class RealTradingSystem:
     def _place_leg_order(self, leg: Dict, quantity: float, trade: Dict) -> bool:
         """Place order for one leg of the arbitrage"""
         platform = None
+        record_error = self._record_error
+        trade_id = trade['id']
         try:
             platform = leg.get('platform', 'Unknown')
             market_id = leg.get('market_id')
-            price = leg['price'] / 100.0  # Convert cents to dollars
+            # Dollar price is precomputed at leg construction; legacy legs
+            # (replayed from before the field existed) still convert here
+            price = leg.get('price_dollars')
+            if price is None:
+                price = leg['price'] / 100.0
             team = leg.get('team', 'Unknown')
             
             if not market_id:
                 error = f"Missing market ID for {platform} ({team})"
-                self._record_error(trade['id'], error)
+                record_error(trade_id, error)
                 print(f"❌ Order placement failed: {error}")
                 return False
             
             print(f"Placing {platform} order for {team}: {quantity} @ ${price:.4f}")
-            
-            if platform == 'Polymarket':
-                # Determine side (Yes/No) based on team code
-                side = 'Yes'  # Default to Yes for away team
-                
-                result = self.polymarket_client.place_order(
-                    market_id=market_id,
-                    side=side,
-                    amount=quantity,
-                    price=price
-                )
-                
-            elif platform == 'Kalshi':
-                side = 'Yes'  # Default to Yes
-                
-                result = self.kalshi_client.place_order(
-                    ticker=market_id,
-                    side=side,
-                    amount=quantity,
-                    price=price
-                )
-            else:
+
+            place_order = self._place_order_for.get(platform)
+            if place_order is None:
                 error = f"Unknown platform: {platform}"
-                self._record_error(trade['id'], error)
+                record_error(trade_id, error)
                 return False
-            
+
+            # Default to Yes side for both platforms
+            result = place_order(market_id, side='Yes', amount=quantity, price=price)
+
             if result.get('success'):
                 order_id = result.get('order_id')
-                trade['order_ids'][platform] = order_id
-                leg['order_id'] = order_id
-                leg['order_status'] = result.get('status')
+                # Both leg threads mutate the shared trade dict; keep the
+                # writes atomic with respect to each other
+                with self._trade_lock:
+                    trade['order_ids'][platform] = order_id
+                    leg['order_id'] = order_id
+                    leg['order_status'] = result.get('status')
                 print(f"✅ {platform} order placed: {order_id}")
                 return True
             else:
                 error = result.get('error', 'Order failed')
-                self._record_error(trade['id'], error)
+                record_error(trade_id, error)
                 print(f"❌ {platform} order failed: {error}")
                 return False
                 
         except Exception as e:
             error = f"Exception placing {platform or 'unknown'} order: {str(e)}"
-            self._record_error(trade['id'], error)
+            record_error(trade_id, error)
             print(f"❌ {error}")
             return False
     
@@ -694,91 +1045,179 @@ class RealTradingSystem:
             
             if not order_id:
                 return
-            
-            if platform == 'Polymarket':
-                self.polymarket_client.cancel_order(order_id)
-            elif platform == 'Kalshi':
-                self.kalshi_client.cancel_order(order_id)
-                
+
+            cancel_order = self._cancel_order_for.get(platform)
+            if cancel_order is not None:
+                cancel_order(order_id)
+
+
         except Exception as e:
             self._record_error(trade.get('id', 'unknown'), f"Cancel failed: {str(e)}")
     
     def _record_error(self, trade_id: str, error: str):
         """Record trading error"""
-        self.data['errors'].append({
-            'trade_id': trade_id,
-            'error': error,
-            'timestamp': datetime.now().isoformat()
-        })
-        # Keep only last 100 errors
-        self.data['errors'] = self.data['errors'][-100:]
-        self.save_data()
+        with self._state_lock:
+            self.data['errors'].append({
+                'trade_id': trade_id,
+                'error': error,
+                'timestamp': datetime.now().isoformat()
+            })
+        # errors is bounded to MAX_ERRORS by its deque maxlen; the replay
+        # path appends into the same bounded deque, so the cap holds there
+        self._append_event('error', self.data['errors'][-1])
     
     def update_settlements(self, check_status_func) -> None:
         """
         Check pending trades and settle them
         Uses the same settlement logic as PaperTradingSystem
         """
-        changed = False
-        
-        for bet in self.data['bets']:
-            if bet['status'] == 'pending':
-                all_legs_resolved = True
-                total_payout = 0.0
-                resolved_legs_count = 0
-                
-                for leg in bet['legs']:
-                    platform = leg.get('platform')
-                    market_id = leg.get('market_id')
-                    
-                    if not market_id:
-                        continue
-                    
-                    status = check_status_func(platform, market_id)
-                    
+        # Nothing pending is the common case between trade windows
+        if not self._pending_bets:
+            return
+
+        # Localize hot lookups for the sweep
+        data = self.data
+
+        now_epoch = time.time()
+
+        # Several pending bets can reference the same market; resolve each
+        # (platform, market_id) pair at most once per sweep. Unresolved
+        # results are additionally held for status_cache_ttl seconds so
+        # fast poll loops don't hammer markets that rarely flip state.
+        status_cache = {}
+        ttl_cache = self._status_cache
+        ttl = self.status_cache_ttl
+        now_mono = time.monotonic()
+
+        def store_status(key, status):
+            status_cache[key] = status
+            if status.get('resolved'):
+                ttl_cache.pop(key, None)
+            else:
+                ttl_cache[key] = (now_mono, status)
+
+        def cached_status(platform, market_id):
+            key = (platform, market_id)
+            status = status_cache.get(key)
+            if status is not None:
+                return status
+            entry = ttl_cache.get(key)
+            if entry is not None and now_mono - entry[0] < ttl:
+                return entry[1]
+            status = check_status_func(platform, market_id)
+            store_status(key, status)
+            return status
+
+        # Prefetch the unique market statuses concurrently so N serial
+        # round-trips collapse into one overlapped window; the per-leg
+        # loop below then reads the warm cache. Pairs with a fresh
+        # unresolved TTL entry are skipped outright.
+        pairs = [pair for pair in {(leg.get('platform'), leg.get('market_id'))
+                                   for bet in self._pending_bets
+                                   for leg in bet['legs']
+                                   if leg.get('market_id') and not leg.get('_resolved')}
+                 if not ((entry := ttl_cache.get(pair)) is not None and now_mono - entry[0] < ttl)]
+        if len(pairs) > 1:
+            with ThreadPoolExecutor(max_workers=min(8, len(pairs))) as pool:
+                for pair, status in zip(pairs, pool.map(lambda p: check_status_func(*p), pairs)):
+                    store_status(pair, status)
+
+        # Sweep only the pending worklist; settled history is never touched
+        settled_any = False
+        for bet in list(self._pending_bets):
+            # Single pass over the legs: statuses come from the warm cache,
+            # so visiting the remaining legs after an unresolved one is free
+            unresolved = False
+            total_payout = 0.0
+            resolved_legs_count = 0
+            quantity = bet['quantity']
+
+            for leg in bet['legs']:
+                market_id = leg.get('market_id')
+                if not market_id:
+                    continue
+
+                # A resolved market never un-resolves; remember the outcome
+                # on the leg so later sweeps skip the remote lookup
+                if leg.get('_resolved'):
+                    winner = leg.get('_winner')
+                else:
+                    status = cached_status(leg.get('platform'), market_id)
                     if not status.get('resolved'):
-                        all_legs_resolved = False
-                        break
-                    
-                    resolved_legs_count += 1
-                    
+                        unresolved = True
+                        continue
                     winner = status.get('winner')
-                    if str(winner) == str(leg.get('code')) or str(winner) == str(leg.get('team')):
-                        total_payout += bet['quantity'] * 1.0
-                
-                if all_legs_resolved and resolved_legs_count == len(bet['legs']):
-                    # All legs resolved - settle the trade
+                    leg['_resolved'] = True
+                    leg['_winner'] = winner
+
+                resolved_legs_count += 1
+                winner = str(winner)
+                if winner == str(leg.get('code')) or winner == str(leg.get('team')):
+                    total_payout += quantity
+
+            if not unresolved and resolved_legs_count == len(bet['legs']):
+                # All legs resolved - settle the trade
+                with self._state_lock:
+                    self._total_estimated -= bet.get('profit', 0.0)
+                    self._active_bets.discard(bet['id'])
+                    self._drop_pending(bet)
                     bet['status'] = 'settled'
                     bet['settled_amount'] = total_payout
                     bet['realized_profit'] = total_payout - bet['cost']
                     bet['profit'] = bet['realized_profit']
-                    
-                    self.data['balance'] += total_payout
-                    
+                    self._total_realized += bet['realized_profit']
+
+                    data['balance'] += total_payout
+
                     # Update daily loss tracking
                     if bet['realized_profit'] < 0:
-                        self.data['daily_loss'] += abs(bet['realized_profit'])
-                    
-                    changed = True
-                    print(f"Real Trade Settled: {bet['id']}. Payout: {total_payout}. Profit: {bet['realized_profit']}")
-                
-                elif not all_legs_resolved and resolved_legs_count > 0:
-                    # Some legs resolved but not all - check timeout (24 hours)
-                    trade_age = datetime.now() - datetime.fromisoformat(bet['timestamp'])
-                    if trade_age.total_seconds() > 86400:  # 24 hours
+                        data['daily_loss'] += abs(bet['realized_profit'])
+
+                self._append_event('settle', {
+                    'id': bet['id'],
+                    'fields': {'status': 'settled', 'settled_amount': total_payout,
+                               'realized_profit': bet['realized_profit'], 'profit': bet['profit']},
+                    'daily_loss': data['daily_loss'],
+                })
+                self._append_event('bal', data['balance'])
+                settled_any = True
+                print(f"Real Trade Settled: {bet['id']}. Payout: {total_payout}. Profit: {bet['realized_profit']}")
+
+            elif unresolved and resolved_legs_count > 0:
+                # Some legs resolved but not all - check timeout (24 hours).
+                # Legacy bets lack the epoch copy; parse once and memoize
+                ts_epoch = bet.get('_ts_epoch')
+                if ts_epoch is None:
+                    ts_epoch = datetime.fromisoformat(bet['timestamp']).timestamp()
+                    bet['_ts_epoch'] = ts_epoch
+                if now_epoch - ts_epoch > 86400:  # 24 hours
+                    with self._state_lock:
+                        self._total_estimated -= bet.get('profit', 0.0)
+                        self._active_bets.discard(bet['id'])
+                        self._drop_pending(bet)
                         bet['status'] = 'incomplete'
                         bet['settled_amount'] = total_payout
                         bet['realized_profit'] = total_payout - bet['cost']
                         bet['profit'] = bet['realized_profit']
-                        
-                        self.data['balance'] += total_payout
-                        
+
+                        data['balance'] += total_payout
+
                         # Track any loss
                         if bet['realized_profit'] < 0:
-                            self.data['daily_loss'] += abs(bet['realized_profit'])
-                        
-                        changed = True
-                        print(f"Real Trade Marked Incomplete (timeout): {bet['id']}. Partial payout: {total_payout}. Profit: {bet['realized_profit']}")
-        
-        if changed:
-            self.save_data()
+                            data['daily_loss'] += abs(bet['realized_profit'])
+
+                    self._append_event('settle', {
+                        'id': bet['id'],
+                        'fields': {'status': 'incomplete', 'settled_amount': total_payout,
+                                   'realized_profit': bet['realized_profit'], 'profit': bet['profit'],
+                                   '_ts_epoch': ts_epoch},
+                        'daily_loss': data['daily_loss'],
+                    })
+                    self._append_event('bal', data['balance'])
+                    settled_any = True
+                    print(f"Real Trade Marked Incomplete (timeout): {bet['id']}. Partial payout: {total_payout}. Profit: {bet['realized_profit']}")
+
+        # A terminal status is the only thing that can create new
+        # archive candidates, so the retention scan runs only then
+        if settled_any:
+            self._archive_old_bets()
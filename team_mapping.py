@@ -1,6 +1,10 @@
 # NBA Team Name Mapping between Polymarket and Kalshi
 # Polymarket uses team nicknames, Kalshi uses city names
 
+import sys
+from functools import lru_cache
+from types import MappingProxyType
+
 # NBA Team Logos (using ESPN's CDN)
 TEAM_LOGOS = {
     'ATL': 'https://a.espncdn.com/i/teamlogos/nba/500/atl.png',
@@ -75,6 +79,20 @@ POLYMARKET_TO_CODE = {v[0]: k for k, v in NBA_TEAMS.items()}
 KALSHI_TO_CODE = {v[1]: k for k, v in NBA_TEAMS.items()}
 FULLNAME_TO_CODE = {v[2]: k for k, v in NBA_TEAMS.items()}
 
+# Merged view for the any-platform fallback: one hash probe instead of
+# three cascaded lookups (later dicts win on collisions, so Polymarket
+# keeps its current precedence)
+_ALL_TO_CODE = {**FULLNAME_TO_CODE, **KALSHI_TO_CODE, **POLYMARKET_TO_CODE}
+
+# The mappings never change after import: intern the keys so lookup
+# hashing can use cached hashes / pointer identity, and freeze the dicts
+# so accidental writes fail loudly
+POLYMARKET_TO_CODE = MappingProxyType({sys.intern(k): v for k, v in POLYMARKET_TO_CODE.items()})
+KALSHI_TO_CODE = MappingProxyType({sys.intern(k): v for k, v in KALSHI_TO_CODE.items()})
+FULLNAME_TO_CODE = MappingProxyType({sys.intern(k): v for k, v in FULLNAME_TO_CODE.items()})
+_ALL_TO_CODE = MappingProxyType({sys.intern(k): v for k, v in _ALL_TO_CODE.items()})
+
+@lru_cache(maxsize=4096)
 def normalize_team_name(name, platform='polymarket'):
     """
     Normalize team name to standard team code
@@ -86,20 +104,18 @@ def normalize_team_name(name, platform='polymarket'):
     Returns:
         Team code (e.g., 'GSW', 'LAL') or None if not found
     """
-    name = name.strip()
-
+    # Fast path: most inputs are already clean keys, so probe the mapping
+    # directly and only pay for the strip on a miss
     if platform == 'polymarket':
-        return POLYMARKET_TO_CODE.get(name)
+        return POLYMARKET_TO_CODE.get(name) or POLYMARKET_TO_CODE.get(name.strip())
     elif platform == 'kalshi':
-        return KALSHI_TO_CODE.get(name)
+        return KALSHI_TO_CODE.get(name) or KALSHI_TO_CODE.get(name.strip())
     elif platform in ['odds_api', 'manifold']:
         # These platforms use full team names
-        return FULLNAME_TO_CODE.get(name)
+        return FULLNAME_TO_CODE.get(name) or FULLNAME_TO_CODE.get(name.strip())
     else:
-        # Try all mappings
-        return (POLYMARKET_TO_CODE.get(name) or
-                KALSHI_TO_CODE.get(name) or
-                FULLNAME_TO_CODE.get(name))
+        # Try all mappings via the merged dict
+        return _ALL_TO_CODE.get(name) or _ALL_TO_CODE.get(name.strip())
 
 def get_team_info(code):
     """Get team information by team code"""
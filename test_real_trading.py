@@ -8,16 +8,26 @@ import os
 import json
 from datetime import datetime
 
+# Shared PaperTradingSystem for the tests below: each construction
+# re-reads and parses the JSON state file, so build it once and let
+# every test that doesn't specifically need a fresh reload reuse it
+_pts = None
+
+def _get_paper_trading_system():
+    global _pts
+    if _pts is None:
+        from paper_trading import PaperTradingSystem
+        _pts = PaperTradingSystem()
+    return _pts
+
 def test_paper_trading():
     """Test paper trading system"""
     print("\n" + "=" * 60)
     print("TEST 1: Paper Trading System")
     print("=" * 60)
-    
-    from paper_trading import PaperTradingSystem
-    
-    # Create instance
-    pts = PaperTradingSystem()
+
+    # Shared instance; loading state from disk once is enough
+    pts = _get_paper_trading_system()
     state = pts.get_state()
     
     print(f"✅ PaperTradingSystem initialized")
@@ -131,15 +141,16 @@ def test_persistence():
     print("=" * 60)
     
     from paper_trading import PaperTradingSystem
-    
-    pts = PaperTradingSystem()
+
+    pts = _get_paper_trading_system()
     initial_balance = pts.get_state()['balance']
-    
+
     # Modify and save
     pts.data['balance'] -= 10.0
     pts.save_data()
-    
-    # Reload
+
+    # Reload: this one deliberately constructs a fresh instance, since
+    # reading the modified file back is the behavior under test
     pts2 = PaperTradingSystem()
     new_balance = pts2.get_state()['balance']
     